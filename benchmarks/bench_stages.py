@@ -0,0 +1,232 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# the dashboard resolves data from the repository root
+INVOKED_FROM = os.getcwd()
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+os.chdir(ROOT)
+
+from data_loader import DATA_PATH, build_sidecar, load_ohlcv, read_csv  # noqa: E402
+from analytics import price_stats, return_stats, volume_stats  # noqa: E402
+from date_index import date_bounds, date_values, slice_dates  # noqa: E402
+from figures import price_figure, returns_figure, volatility_figure, rsi_figure  # noqa: E402
+from indicators import compute_indicators, add_indicators  # noqa: E402
+from range_stats import RangeStats  # noqa: E402
+from settings import MAX_POINTS_PER_TRACE  # noqa: E402
+from styles import UP_COLOR, DOWN_COLOR  # noqa: E402
+
+# Times each stage of a dashboard rerun separately, at the bundled dataset
+# size and at synthetic multiples of it (daily and minute bars), and writes
+# the results as JSON so two revisions can be compared:
+#   python benchmarks/bench_stages.py --output before.json
+#   python benchmarks/bench_stages.py --output after.json
+#   python benchmarks/bench_stages.py --compare before.json after.json
+
+# the legacy per-row loops are skipped above this many rows
+LEGACY_MAX_ROWS = 200_000
+
+
+def synthetic_ohlcv(rows, freq, seed=0):
+    rng = np.random.default_rng(seed)
+    if freq == 'min':
+        # 1-minute bars across 8.5-hour sessions on business days
+        days = pd.bdate_range('2000-01-03', periods=-(-rows // 510))
+        minutes = np.arange(510) * np.timedelta64(1, 'm') + np.timedelta64(9 * 60, 'm')
+        dates = (days.values[:, None] + minutes[None, :]).ravel()[:rows]
+        sigma = 0.0008
+    else:
+        # overflows datetime64[ns] past ~150k business days
+        dates = pd.bdate_range('1700-01-01', periods=rows).values
+        sigma = 0.02
+    close = 50 * np.exp(np.cumsum(rng.normal(0, sigma, rows)))
+    open_ = close * np.exp(rng.normal(0, sigma / 2, rows))
+    spread = np.abs(rng.normal(0, sigma, rows)) * close
+    return pd.DataFrame({
+        'Date': dates,
+        'Adj_Close': close,
+        'Close': close,
+        'High': np.maximum(open_, close) + spread,
+        'Low': np.minimum(open_, close) - spread,
+        'Open': open_,
+        'Volume': rng.integers(100_000, 2_000_000, rows),
+    })
+
+
+def timed(fn, repeats):
+    times = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, times
+
+
+def bench_dataset(name, csv_path, repeats, cache_dir):
+    results = []
+
+    def record(stage, fn, reps=repeats, **extra):
+        result, times = timed(fn, reps)
+        results.append({'dataset': name, 'stage': stage, 'min_s': min(times),
+                        'median_s': statistics.median(times), 'repeats': reps, **extra})
+        return result
+
+    # load
+    record('load.csv_parse', lambda: read_csv(csv_path))
+    record('load.sidecar_build', lambda: build_sidecar(csv_path, cache_dir), reps=1)
+    df = record('load.sidecar_mmap', lambda: load_ohlcv(csv_path, cache_dir))
+    rows = len(df)
+    for result in results:
+        result['rows'] = rows
+
+    # date filter over the second half of the history
+    dates = date_values(df)
+    start = pd.Timestamp(dates[rows // 2]).date()
+    end = pd.Timestamp(dates[-1]).date()
+    record('filter.dt_date_mask', lambda: df.loc[(df['Date'].dt.date >= start) & (df['Date'].dt.date <= end)],
+           rows=rows)
+    record('filter.searchsorted', lambda: slice_dates(df, start, end, dates=dates), rows=rows)
+
+    # indicators
+    record('indicators.compute', lambda: compute_indicators(df), rows=rows)
+    full = add_indicators(df)
+    window = slice_dates(full, start, end, dates=dates)
+
+    # volume bar colors
+    if rows <= LEGACY_MAX_ROWS:
+        record('volume_colors.iterrows',
+               lambda: [UP_COLOR if row['Close'] >= row['Open'] else DOWN_COLOR for _, row in window.iterrows()],
+               rows=rows)
+    record('volume_colors.vectorized', lambda: np.where(window['Up'], UP_COLOR, DOWN_COLOR), rows=rows)
+
+    # figures, their JSON serialization and its size
+    builders = {
+        'price': lambda: price_figure(window, True, True, (20, 50), MAX_POINTS_PER_TRACE)[0],
+        'returns': lambda: returns_figure(window),
+        'volatility': lambda: volatility_figure(window, MAX_POINTS_PER_TRACE),
+        'rsi': lambda: rsi_figure(window, MAX_POINTS_PER_TRACE),
+    }
+    for figure_name, build in builders.items():
+        fig = record(f'figure.{figure_name}.build', build, rows=rows)
+        payload = record(f'figure.{figure_name}.to_json', fig.to_json, rows=rows)
+        results[-1]['bytes'] = len(payload.encode())
+
+    # summary statistics: scanning the window against range queries on the
+    # prefix sum / sparse table index
+    record('stats.window_scan',
+           lambda: (price_stats(window['High'], window['Low'], window['Close']),
+                    return_stats(window['Returns']), volume_stats(window['Volume'])),
+           rows=rows)
+    index = record('stats.index_build', lambda: RangeStats(full), rows=rows)
+    lo, hi = date_bounds(dates, start, end)
+    record('stats.range_query',
+           lambda: (index.price_stats(lo, hi), index.return_stats(lo, hi), index.volume_stats(lo, hi)),
+           rows=rows)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True, cwd=ROOT).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scales, freqs, repeats, output):
+    base_rows = len(read_csv(DATA_PATH))
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, 'cache')
+        datasets = [('bmw-1x', DATA_PATH)]
+        for scale in scales:
+            for freq in freqs:
+                if scale == 1 and freq == 'D':
+                    continue
+                name = f'synthetic-{freq}-{scale}x'
+                try:
+                    synthetic = synthetic_ohlcv(base_rows * scale, freq)
+                except (pd.errors.OutOfBoundsDatetime, pd.errors.OutOfBoundsTimedelta):
+                    print(f'skipping {name}: too many daily bars for datetime64[ns]', file=sys.stderr)
+                    continue
+                path = os.path.join(tmp, f'{name}.csv')
+                synthetic.to_csv(path, index=False,
+                                 date_format='%Y-%m-%d %H:%M:%S' if freq == 'min' else '%Y-%m-%d')
+                datasets.append((name, path))
+
+        for name, path in datasets:
+            print(f'benchmarking {name} ...', file=sys.stderr)
+            results.extend(bench_dataset(name, path, repeats, cache_dir))
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'max_points_per_trace': MAX_POINTS_PER_TRACE,
+        },
+        'results': results,
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print_results(results)
+    print(f'\nwrote {output}', file=sys.stderr)
+
+
+def print_results(results):
+    print(f"{'dataset':<26}{'rows':>10}  {'stage':<28}{'median ms':>12}{'bytes':>12}")
+    for r in results:
+        size = f"{r['bytes']:,}" if 'bytes' in r else ''
+        print(f"{r['dataset']:<26}{r['rows']:>10,}  {r['stage']:<28}{r['median_s'] * 1000:>12.2f}{size:>12}")
+
+
+def compare(before_path, after_path):
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+    base = {(r['dataset'], r['stage']): r for r in before['results']}
+    print(f"{before['meta']['revision']} -> {after['meta']['revision']}")
+    print(f"{'dataset':<26}{'stage':<28}{'before ms':>12}{'after ms':>12}{'ratio':>8}")
+    for r in after['results']:
+        old = base.get((r['dataset'], r['stage']))
+        if old is None:
+            continue
+        ratio = r['median_s'] / old['median_s'] if old['median_s'] else float('nan')
+        print(f"{r['dataset']:<26}{r['stage']:<28}{old['median_s'] * 1000:>12.2f}"
+              f"{r['median_s'] * 1000:>12.2f}{ratio:>8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark each stage of a dashboard rerun.')
+    parser.add_argument('--scales', default='1,10,100',
+                        help='comma separated multiples of the bundled dataset size (e.g. 1,10,100,1000)')
+    parser.add_argument('--freqs', default='D,min', help='synthetic bar frequencies: D (daily), min (1-minute)')
+    parser.add_argument('--repeats', type=int, default=3, help='timed runs per stage')
+    parser.add_argument('--output', default='bench_results.json', help='where to write the JSON results')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'),
+                        help='compare two result files instead of running')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*(os.path.join(INVOKED_FROM, path) for path in args.compare))
+        return
+    run([int(s) for s in args.scales.split(',')], args.freqs.split(','), args.repeats,
+        os.path.join(INVOKED_FROM, args.output))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+from arrays import as_float_array
+from indicators import RSI_PERIODS, TRADING_DAYS, calculate_rsi
+
+RSI_OVERBOUGHT = 70
+RSI_OVERSOLD = 30
+
+# Headless analytics behind the dashboard. Everything here takes plain
+# numpy arrays or pandas Series and returns numbers, so it can run in batch
+# jobs and benchmarks without importing Streamlit. NaNs (e.g. the first
+# return of a series) are ignored, as pandas reductions do.
+
+
+def daily_returns(close):
+    close = as_float_array(close)
+    returns = np.full(len(close), np.nan)
+    returns[1:] = close[1:] / close[:-1] - 1
+    return returns
+
+
+def rsi(close, periods=RSI_PERIODS):
+    return calculate_rsi({'Close': pd.Series(as_float_array(close))}, periods).to_numpy()
+
+
+def price_change_pct(close):
+    close = as_float_array(close)
+    return (close[-1] - close[0]) / close[0] * 100
+
+
+def annualized_volatility(close, periods_per_year=TRADING_DAYS):
+    return np.nanstd(daily_returns(close), ddof=1) * np.sqrt(periods_per_year) * 100
+
+
+def sharpe_ratio(returns, periods_per_year=TRADING_DAYS):
+    returns = as_float_array(returns)
+    returns = returns[~np.isnan(returns)]
+    return np.mean(returns) / np.std(returns) * np.sqrt(periods_per_year)
+
+
+def price_stats(high, low, close):
+    high, low, close = as_float_array(high), as_float_array(low), as_float_array(close)
+    average = np.nanmean(close)
+    return {
+        'high': np.nanmax(high),
+        'low': np.nanmin(low),
+        'average': average,
+        'range': np.nanmax(high) - np.nanmin(low),
+        'current_vs_avg_pct': (close[-1] / average - 1) * 100,
+    }
+
+
+def return_stats(returns, periods_per_year=TRADING_DAYS):
+    returns = as_float_array(returns)
+    returns = returns[~np.isnan(returns)]
+    return {
+        'mean': np.mean(returns),
+        'std': np.std(returns, ddof=1),
+        'annualized_return_pct': np.mean(returns) * periods_per_year * 100,
+        'sharpe': sharpe_ratio(returns, periods_per_year),
+        'positive_days_pct': np.mean(returns > 0) * 100,
+    }
+
+
+def volume_stats(volume):
+    volume = as_float_array(volume)
+    average = np.mean(volume)
+    return {
+        'high': np.max(volume),
+        'low': np.min(volume),
+        'average': average,
+        # last five sessions against the first five
+        'trend_pct': (np.mean(volume[-5:]) / np.mean(volume[:5]) - 1) * 100,
+        'volatility_pct': np.std(volume, ddof=1) / average * 100,
+    }
+
+
+# 'golden' when the fast average crossed above the slow one on the last
+# bar, 'death' when it crossed below, otherwise None
+def last_crossover(fast, slow):
+    fast, slow = as_float_array(fast), as_float_array(slow)
+    if len(fast) < 2:
+        return None
+    if fast[-1] > slow[-1] and fast[-2] <= slow[-2]:
+        return 'golden'
+    if fast[-1] < slow[-1] and fast[-2] >= slow[-2]:
+        return 'death'
+    return None
+
+
+# (message, 'success' | 'warning') pairs for the latest bar
+def technical_signals(rsi, fast_ma, slow_ma):
+    signals = []
+
+    # RSI signals
+    last_rsi = as_float_array(rsi)[-1]
+    if last_rsi > RSI_OVERBOUGHT:
+        signals.append(("RSI Overbought", "warning"))
+    elif last_rsi < RSI_OVERSOLD:
+        signals.append(("RSI Oversold", "success"))
+
+    # Moving Average signals
+    cross = last_crossover(fast_ma, slow_ma)
+    if cross == 'golden':
+        signals.append(("Golden Cross Detected", "success"))
+    elif cross == 'death':
+        signals.append(("Death Cross Detected", "warning"))
+
+    return signals
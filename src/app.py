@@ -1,13 +1,37 @@
+import functools
+import os
+
 import streamlit as st
 import streamlit.components.v1 as components
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-from datetime import datetime, timedelta
-import numpy as np
-from scipy.stats import norm
-from plotly.subplots import make_subplots
-from styles import get_page_styling,get_particles_js,URLS
+from streamlit.runtime.scriptrunner import add_script_run_ctx
+from datetime import datetime
+from styles import (PAGE_CSS, get_page_styling, get_particles_js, get_session_injection,
+                    get_starfield_script, asset_path, asset_url)
+from data_loader import COLUMN_DTYPES, DATA_DIR, SymbolRegistry, load_ohlcv
+from indicators import INDICATOR_WARMUP, MA_PERIODS, add_indicators, extend_indicators
+from date_index import PRESET_PERIODS, date_bounds, date_values, preset_range, slice_dates
+from resample import TIMEFRAMES, resample_ohlcv
+from partitions import DAILY_LEVEL, LEVEL_LABELS, RAW_LEVEL, PartitionedStore, is_partitioned
+from analytics import RSI_OVERBOUGHT, RSI_OVERSOLD, price_change_pct, technical_signals
+from range_stats import RangeStats
+from result_cache import ResultCache, code_version
+from backtest import ma_cross_signal, rsi_signal, run_backtest
+from sweep import SWEEPS, new_executor, run_sweep
+from simulation import METHODS, simulate_prices
+from risk import RISK_WINDOWS, rolling_risk
+from correlation import CORRELATION_WINDOWS, AlignedUniverse, rebased_performance, rolling_comovement
+from figures import (price_figure, returns_figure, volatility_figure, rsi_figure,
+                     price_stats_table, return_stats_table, volume_stats_table,
+                     live_price_figure, update_live_figure, backtest_figure, sweep_heatmap,
+                     fan_chart, rolling_risk_figure, relative_performance_figure, comovement_figure,
+                     correlation_heatmap)
+from streaming import FileTailSource, LiveFeed, ReplaySource
+from profiling import RerunProfiler
+from warmup import Warmup
+from settings import (MAX_POINTS_PER_TRACE, PROFILE, SYMBOL_CACHE_SIZE, SWEEP_WORKERS,
+                      RESULT_CACHE_MB, RESULT_CACHE_DIR, RESULT_CACHE_DISK_MB, WARMUP,
+                      MC_PATHS, MC_CHUNK_PATHS, RENDER_MODE, STARFIELD_FPS, STARFIELD_PIXELS_PER_STAR,
+                      LIVE_SOURCE, LIVE_BUFFER_SIZE, LIVE_REFRESH_SECONDS, LIVE_BARS_PER_TICK)
 
 # config
 st.set_page_config(
@@ -17,26 +41,239 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Opt-in timing of every section below (BMW_PROFILE=1 or ?profile=1)
+profiler = RerunProfiler(PROFILE or st.query_params.get("profile") in ("1", "true"))
 
 
 #st.markdown(particles_js, unsafe_allow_html=True)
-st.markdown(get_page_styling(), unsafe_allow_html=True)
-
-components.html(get_particles_js(), height=800, scrolling=False)
-
-
-# Load  data
-@st.cache_data
-def load_data():
-    df = pd.read_csv('data/BMW_Data.csv')
-    df['Date'] = pd.to_datetime(df['Date'])
-    return df
-
-df = load_data()
+if RENDER_MODE == "performance":
+    # styles and a throttled starfield go into the page once per session
+    if not st.session_state.get("styles_injected"):
+        components.html(get_session_injection(
+            PAGE_CSS, get_starfield_script(STARFIELD_FPS, STARFIELD_PIXELS_PER_STAR)), height=0)
+        st.session_state["styles_injected"] = True
+else:
+    st.markdown(get_page_styling(), unsafe_allow_html=True)
+
+    components.html(get_particles_js(), height=800, scrolling=False)
+profiler.lap("styling")
+
+
+def load_symbol(path):
+    if is_partitioned(path):
+        # intraday symbols are analyzed on their daily level; only the price
+        # chart reads finer levels, from the partitions a range touches
+        return add_indicators(PartitionedStore(path).level_frame(DAILY_LEVEL))
+    return add_indicators(load_ohlcv(path))
+
+# One registry per process over every csv in the data directory (and every
+# partitioned intraday store under data/partitions); a symbol
+# is loaded (memory-mapped columnar sidecar, csv only when it is stale, with
+# every indicator precomputed over the full history) on first selection and
+# only the SYMBOL_CACHE_SIZE most recently used frames stay in memory.
+# Bars appended with ingest.py are picked up and their indicators extended
+# incrementally.
+@st.cache_resource
+def get_registry():
+    return SymbolRegistry(DATA_DIR, max_loaded=SYMBOL_CACHE_SIZE, loader=load_symbol,
+                          extender=extend_indicators)
+
+def load_data(symbol):
+    return get_registry().load(symbol)
+
+# Weekly/monthly/quarterly bars are aggregated from the daily frame once and
+# get their own full-history indicators; the symbol's data version is part
+# of the key so appended bars and rewritten files rebuild them
+@st.cache_resource(max_entries=SYMBOL_CACHE_SIZE * len(TIMEFRAMES))
+def _resampled(symbol, timeframe, version):
+    spec = TIMEFRAMES[timeframe]
+    bars = resample_ohlcv(load_data(symbol)[list(COLUMN_DTYPES)], spec["rule"])
+    return add_indicators(bars, spec["periods_per_year"])
+
+def load_timeframe(symbol, timeframe):
+    daily = load_data(symbol)
+    if TIMEFRAMES[timeframe]["rule"] is None:
+        return daily
+    return _resampled(symbol, timeframe, get_registry().version(symbol))
+
+# Figures and other derived results are shared by every session through
+# one byte-bounded LRU cache (optionally backed by BMW_RESULT_CACHE_DIR),
+# each keyed by the symbol's data version and only the sidebar inputs it
+# depends on, so toggling one indicator rebuilds the price chart alone and
+# a view any analyst has opened is served from cache
+@st.cache_resource
+def get_result_cache():
+    return ResultCache(RESULT_CACHE_MB << 20, RESULT_CACHE_DIR or None, RESULT_CACHE_DISK_MB << 20,
+                       version=code_version(os.path.dirname(os.path.abspath(__file__))))
+
+def shared_result(fn):
+    @functools.wraps(fn)
+    def wrapper(symbol, *args):
+        key = (fn.__name__, symbol, get_registry().version(symbol), *args)
+        return get_result_cache().get_or_compute(key, lambda: fn(symbol, *args))
+    return wrapper
+
+def _window(symbol, timeframe, start, end):
+    return slice_dates(load_timeframe(symbol, timeframe), start, end)
+
+# returns the figure, how many bars each candle merges and the candle
+# unit; narrow ranges of intraday symbols are drawn from the finest
+# partitioned level that fits the point budget
+@shared_result
+def cached_price_figure(symbol, timeframe, start, end, show_ma, show_bb, ma_periods):
+    path = get_registry().path(symbol)
+    if TIMEFRAMES[timeframe]["rule"] is None and is_partitioned(path):
+        bars, level, lead = PartitionedStore(path).query(start, end, MAX_POINTS_PER_TRACE,
+                                                         warmup=INDICATOR_WARMUP)
+        if level != DAILY_LEVEL:
+            window = add_indicators(bars).iloc[lead:]
+            fig, bar_size = price_figure(window, show_ma, show_bb, ma_periods, MAX_POINTS_PER_TRACE,
+                                         unit='bar')
+            return fig, bar_size, LEVEL_LABELS[level]
+    unit = TIMEFRAMES[timeframe]["unit"]
+    fig, bar_size = price_figure(_window(symbol, timeframe, start, end), show_ma, show_bb, ma_periods,
+                                 MAX_POINTS_PER_TRACE, unit=unit)
+    return fig, bar_size, unit
+
+@shared_result
+def cached_returns_figure(symbol, timeframe, start, end):
+    return returns_figure(_window(symbol, timeframe, start, end))
+
+@shared_result
+def cached_volatility_figure(symbol, timeframe, start, end):
+    return volatility_figure(_window(symbol, timeframe, start, end), MAX_POINTS_PER_TRACE,
+                             unit=TIMEFRAMES[timeframe]["unit"])
+
+# rolling metrics over the full history, so windows at the start of a date
+# range are already full; rebuilt when the symbol's data version changes
+@st.cache_resource(max_entries=SYMBOL_CACHE_SIZE * len(RISK_WINDOWS))
+def _rolling_risk(symbol, timeframe, window, version):
+    frame = load_timeframe(symbol, timeframe)
+    return rolling_risk(frame['Close'], window, TIMEFRAMES[timeframe]["periods_per_year"])
+
+@shared_result
+def cached_rolling_risk_figure(symbol, timeframe, start, end, window):
+    frame = load_timeframe(symbol, timeframe)
+    lo, hi = date_bounds(date_values(frame), start, end)
+    metrics = _rolling_risk(symbol, timeframe, window, get_registry().version(symbol)).iloc[lo:hi]
+    return rolling_risk_figure(date_values(frame)[lo:hi], metrics, window, MAX_POINTS_PER_TRACE,
+                               unit=TIMEFRAMES[timeframe]["unit"])
+
+@shared_result
+def cached_rsi_figure(symbol, timeframe, start, end):
+    return rsi_figure(_window(symbol, timeframe, start, end), MAX_POINTS_PER_TRACE)
+
+# prefix sums and sparse tables over the full history answer the metric
+# cards and statistics tables for any date range in constant time, per
+# data version of the symbol
+@st.cache_resource(max_entries=SYMBOL_CACHE_SIZE * len(TIMEFRAMES))
+def get_range_stats(symbol, timeframe, version):
+    return RangeStats(load_timeframe(symbol, timeframe))
+
+def stats_tables(range_stats, lo, hi, timeframe):
+    periods_per_year = TIMEFRAMES[timeframe]["periods_per_year"]
+    return (price_stats_table(range_stats.price_stats(lo, hi)),
+            return_stats_table(range_stats.return_stats(lo, hi, periods_per_year), period_label=timeframe),
+            volume_stats_table(range_stats.volume_stats(lo, hi), period_label=timeframe))
+
+@shared_result
+def cached_backtest(symbol, timeframe, start, end, rule, params):
+    frame = load_timeframe(symbol, timeframe)
+    # signals are computed over the full history so the averages are warm
+    # at the start of the window
+    if rule == "MA Cross":
+        signal = ma_cross_signal(frame['Close'], *params)
+    else:
+        signal = rsi_signal(frame['RSI'], *params)
+    lo, hi = date_bounds(date_values(frame), start, end)
+    dates = date_values(frame)[lo:hi]
+    close = frame['Close'].to_numpy()[lo:hi]
+    result = run_backtest(dates, close, signal[lo:hi], TIMEFRAMES[timeframe]["periods_per_year"])
+    fig = backtest_figure(dates, result['equity'], close / close[0], result['drawdown'], MAX_POINTS_PER_TRACE)
+    return fig, result
+
+# one worker pool per server process, shared by every session's sweeps
+@st.cache_resource
+def get_sweep_executor():
+    return new_executor(SWEEP_WORKERS)
+
+@shared_result
+def cached_sweep(symbol, timeframe, start, end, kind):
+    frame = load_timeframe(symbol, timeframe)
+    lo, hi = date_bounds(date_values(frame), start, end)
+    grid = run_sweep(frame['Close'].to_numpy(), kind, lo, hi, TIMEFRAMES[timeframe]["periods_per_year"],
+                     executor=get_sweep_executor())
+    return sweep_heatmap(grid), grid
+
+@shared_result
+def cached_simulation(symbol, timeframe, start, end, method, horizon):
+    close = _window(symbol, timeframe, start, end)['Close'].to_numpy()
+    result = simulate_prices(close, horizon, MC_PATHS, method, MC_CHUNK_PATHS)
+    fig = fan_chart(close[-2 * horizon:], result['fan'], TIMEFRAMES[timeframe]["unit"])
+    return fig, result['risk']
+
+# Peer comparison: the ticker and its peers aligned on their shared dates,
+# with the rolling correlation and beta matrices over the full history, per
+# universe, timeframe and window; the data versions rebuild them when any
+# member's data changes
+@st.cache_resource(max_entries=SYMBOL_CACHE_SIZE * len(CORRELATION_WINDOWS))
+def _comovement(universe, versions, timeframe, window):
+    aligned = AlignedUniverse({s: load_timeframe(s, timeframe) for s in universe})
+    closes = aligned.matrix('Close')
+    correlation, beta = rolling_comovement(closes, window)
+    return aligned.dates, closes, correlation, beta
+
+@shared_result
+def cached_peer_figures(symbol, peers, versions, timeframe, start, end, window):
+    symbols = [symbol, *peers]
+    dates, closes, correlation, beta = _comovement(tuple(symbols), versions, timeframe, window)
+    lo, hi = date_bounds(dates, start, end)
+    if hi - lo < 2:
+        return None
+    unit = TIMEFRAMES[timeframe]["unit"]
+    performance = relative_performance_figure(dates[lo:hi], rebased_performance(closes, lo, hi), symbols,
+                                              MAX_POINTS_PER_TRACE)
+    comovement = comovement_figure(dates[lo:hi], correlation[lo:hi], beta[lo:hi], symbols, window,
+                                   MAX_POINTS_PER_TRACE, unit=unit)
+    matrix = correlation_heatmap(correlation[hi - 1], symbols,
+                                 f"{window}-{unit.title()} Correlation to {str(dates[hi - 1])[:10]}")
+    return performance, comovement, matrix, hi - lo
+
+DEFAULT_MA_PERIODS = [20, 50]
+DEFAULT_RISK_WINDOW = 63
+
+# Everything the date presets show with the default controls: the price
+# charts first, widest range first (the custom range opens on all time),
+# then the range statistics and the returns, volatility, rolling risk and
+# RSI charts behind the section toggles
+def warmup_tasks(symbol, timeframe):
+    dates = date_values(load_timeframe(symbol, timeframe))
+    ranges = [preset_range(dates, preset) for preset in reversed(PRESET_PERIODS)]
+    tasks = [(cached_price_figure, (symbol, timeframe, start, end, True, True, tuple(DEFAULT_MA_PERIODS)))
+             for start, end in ranges]
+    tasks.append((get_range_stats, (symbol, timeframe, get_registry().version(symbol))))
+    for start, end in ranges:
+        tasks += [(cached_returns_figure, (symbol, timeframe, start, end)),
+                  (cached_volatility_figure, (symbol, timeframe, start, end)),
+                  (cached_rolling_risk_figure, (symbol, timeframe, start, end, DEFAULT_RISK_WINDOW)),
+                  (cached_rsi_figure, (symbol, timeframe, start, end))]
+    return tasks
+
+# one background warm-up per symbol and data version, started once the
+# symbol is loaded, on the default timeframe; the thread carries the
+# starting run's context so the cached functions it calls find the runtime
+@st.cache_resource(max_entries=SYMBOL_CACHE_SIZE)
+def get_warmup(symbol, version):
+    warmup = Warmup(warmup_tasks(symbol, next(iter(TIMEFRAMES))), name=f"warmup-{symbol}")
+    add_script_run_ctx(warmup.thread)
+    return warmup.start()
 
 # Sidebar with enhanced styling
 with st.sidebar:
-    st.image(URLS["BMW"], width=200)
+    if st.get_option("server.enableStaticServing"):
+        st.markdown(f'<img src="{asset_url("BMW")}" width="200">', unsafe_allow_html=True)
+    else:
+        st.image(asset_path("BMW"), width=200)
     st.markdown("""
         <div class="glass-card">
             <h1 style='color: #1E88E5; text-align: center; margin-bottom: 20px;'>
@@ -45,34 +282,38 @@ with st.sidebar:
         </div>
     """, unsafe_allow_html=True)
     
+    symbols = get_registry().symbols()
+    symbol = st.selectbox(
+        "Select Ticker",
+        symbols,
+        index=symbols.index("BMW") if "BMW" in symbols else 0
+    )
+    timeframe = st.selectbox("Timeframe", list(TIMEFRAMES))
+    profiler.lap("sidebar.ticker")
+    df = load_timeframe(symbol, timeframe)
+    dates = date_values(df)
+    warmup = get_warmup(symbol, get_registry().version(symbol)) if WARMUP else None
+    profiler.lap("load_data")
+    
     # Date range selector with presets
     date_preset = st.selectbox(
         "Select Time Period",
-        ["Custom", "1 Month", "3 Months", "6 Months", "1 Year", "5 Years", "All Time"]
+        ["Custom"] + list(PRESET_PERIODS)
     )
     
     if date_preset == "Custom":
+        first_date, last_date = preset_range(dates, "All Time")
         date_range = st.date_input(
             "Select Custom Date Range",
-            value=(df['Date'].min(), df['Date'].max()),
-            min_value=df['Date'].min().date(),
-            max_value=df['Date'].max().date()
+            value=(first_date, last_date),
+            min_value=first_date,
+            max_value=last_date
         )
+        # the picker returns a single date while the range is half selected
+        if len(date_range) == 1:
+            date_range = (date_range[0], date_range[0])
     else:
-        end_date = df['Date'].max()
-        if date_preset == "1 Month":
-            start_date = end_date - timedelta(days=30)
-        elif date_preset == "3 Months":
-            start_date = end_date - timedelta(days=90)
-        elif date_preset == "6 Months":
-            start_date = end_date - timedelta(days=180)
-        elif date_preset == "1 Year":
-            start_date = end_date - timedelta(days=365)
-        elif date_preset == "5 Years":
-            start_date = end_date - timedelta(days=1825)
-        else:  # All Time
-            start_date = df['Date'].min()
-        date_range = (start_date.date(), end_date.date())
+        date_range = preset_range(dates, date_preset)
 
     st.markdown("""
         <div class="glass-card">
@@ -85,25 +326,59 @@ with st.sidebar:
     
     ma_periods = st.multiselect(
         "Moving Average Periods",
-        options=[20, 50, 100, 200],
-        default=[20, 50]
+        options=list(MA_PERIODS),
+        default=DEFAULT_MA_PERIODS
     )
 
-# Filter data based on date range
-mask = (df['Date'].dt.date >= date_range[0]) & (df['Date'].dt.date <= date_range[1])
-filtered_df = df.loc[mask]
+    live_mode = st.toggle("📡 Live Feed", help="Stream bars from BMW_LIVE_SOURCE, or replay the selected ticker")
+
+    st.markdown("""
+        <div class="glass-card">
+            <h3 style='color: #1E88E5;'>🧪 Strategy Backtest</h3>
+        </div>
+    """, unsafe_allow_html=True)
+
+    backtest_rule = st.selectbox("Strategy", ["MA Cross", "RSI"])
+    if backtest_rule == "MA Cross":
+        backtest_params = st.slider("Fast / Slow MA Periods", 5, 200, (20, 50), step=5)
+    else:
+        backtest_params = st.slider("RSI Oversold / Overbought", 0, 100, (RSI_OVERSOLD, RSI_OVERBOUGHT))
+profiler.lap("sidebar.controls")
+
+# Filter data based on date range (binary search on the sorted dates)
+start, end = date_range
+lo, hi = date_bounds(dates, start, end)
+if hi <= lo:
+    # e.g. a single custom date on a weekend or holiday
+    st.info("No trading days in the selected range")
+    st.stop()
+filtered_df = df.iloc[lo:hi]
+range_stats = get_range_stats(symbol, timeframe, get_registry().version(symbol))
+profiler.lap("filter")
 
 # Main header with glassmorphism effect
 st.markdown("""
     <div class="glass-card" style="text-align: center; padding: 30px 0;">
         <h1 style='font-size: 42px; margin-bottom: 10px;'>
-            <span style='color: #1E88E5;'>BMW</span> Stock Analytics Dashboard
+            <span style='color: #1E88E5;'>{}</span> Stock Analytics Dashboard
         </h1>
         <p style='color: rgba(255, 255, 255, 0.7); font-size: 18px;'>
             Comprehensive analysis and real-time insights
         </p>
     </div>
-""", unsafe_allow_html=True)
+""".format(symbol), unsafe_allow_html=True)
+
+# Progress of the background warm-up, polled until every preset view is
+# cached; the page then reruns once to drop the indicator
+@st.fragment(run_every=1)
+def warmup_status(warmup):
+    if warmup.ready:
+        st.rerun()
+    st.progress(warmup.done / len(warmup),
+                text=f"Precomputing preset views in the background... {warmup.done}/{len(warmup)}")
+
+if warmup is not None and not warmup.ready:
+    warmup_status(warmup)
 
 # Key metrics with enhanced glassmorphism styling
 col1, col2, col3, col4 = st.columns(4)
@@ -117,8 +392,7 @@ with col1:
     """.format(filtered_df['Close'].iloc[-1]), unsafe_allow_html=True)
 
 with col2:
-    price_change = ((filtered_df['Close'].iloc[-1] - filtered_df['Close'].iloc[0]) / 
-                    filtered_df['Close'].iloc[0] * 100)
+    price_change = range_stats.price_change_pct(lo, hi)
     color = "#00ff88" if price_change >= 0 else "#ff4444"
     st.markdown(f"""
         <div class="metric-card">
@@ -130,7 +404,7 @@ with col2:
     """, unsafe_allow_html=True)
 
 with col3:
-    avg_volume = filtered_df['Volume'].mean()
+    avg_volume = range_stats.average_volume(lo, hi)
     st.markdown("""
         <div class="metric-card">
             <div class="metric-value">{:,.0f}</div>
@@ -139,13 +413,14 @@ with col3:
     """.format(avg_volume), unsafe_allow_html=True)
 
 with col4:
-    volatility = filtered_df['Close'].pct_change().std() * np.sqrt(252) * 100
+    volatility = range_stats.annualized_volatility(lo, hi, TIMEFRAMES[timeframe]["periods_per_year"])
     st.markdown("""
         <div class="metric-card">
             <div class="metric-value">{:,.2f}%</div>
             <div class="metric-label">Annualized Volatility</div>
         </div>
     """.format(volatility), unsafe_allow_html=True)
+profiler.lap("metrics")
 
 # Main chart section with glassmorphism
 st.markdown("""
@@ -154,351 +429,389 @@ st.markdown("""
     </div>
 """, unsafe_allow_html=True)
 
-# Create subplot with shared x-axis
-fig = make_subplots(rows=2, cols=1, shared_xaxes=True, 
-                    vertical_spacing=0.03, 
-                    row_heights=[0.7, 0.3])
-
-# Candlestick chart with enhanced styling
-fig.add_trace(go.Candlestick(
-    x=filtered_df['Date'],
-    open=filtered_df['Open'],
-    high=filtered_df['High'],
-    low=filtered_df['Low'],
-    close=filtered_df['Close'],
-    name='OHLC',
-    increasing_line_color='#00ff88',
-    decreasing_line_color='#ff4444'
-), row=1, col=1)
-
-# Add Moving Averages
-if show_ma:
-    for period in ma_periods:
-        ma = filtered_df['Close'].rolling(window=period).mean()
-        fig.add_trace(go.Scatter(
-            x=filtered_df['Date'],
-            y=ma,
-            name=f'{period}-day MA',
-            line=dict(width=1)
-        ), row=1, col=1)
-
-# Add Bollinger Bands
-if show_bb:
-    ma20 = filtered_df['Close'].rolling(window=20).mean()
-    stddev = filtered_df['Close'].rolling(window=20).std()
-    upper_band = ma20 + (stddev * 2)
-    lower_band = ma20 - (stddev * 2)
-    
-    fig.add_trace(go.Scatter(
-        x=filtered_df['Date'],
-        y=upper_band,
-        name='Upper BB',
-        line=dict(color='rgba(173, 204, 255, 0.7)', width=1),
-        fill=None
-    ), row=1, col=1)
-    
-    fig.add_trace(go.Scatter(
-        x=filtered_df['Date'],
-        y=lower_band,
-        name='Lower BB',
-        line=dict(color='rgba(173, 204, 255, 0.7)', width=1),
-        fill='tonexty',
-        fillcolor='rgba(173, 204, 255, 0.1)'
-    ), row=1, col=1)
-
-# Volume bars
-colors = ['#00ff88' if row['Close'] >= row['Open'] else '#ff4444' 
-          for index, row in filtered_df.iterrows()]
-
-fig.add_trace(go.Bar(
-    x=filtered_df['Date'],
-    y=filtered_df['Volume'],
-    name='Volume',
-    marker_color=colors,
-    opacity=0.8
-), row=2, col=1)
-
-# Update layout for professional look
-fig.update_layout(
-    template='plotly_dark',
-    height=800,
-    margin=dict(l=0, r=0, t=0, b=0),
-    plot_bgcolor='rgba(0,0,0,0)',
-    paper_bgcolor='rgba(0,0,0,0)',
-    xaxis_rangeslider_visible=False,
-    showlegend=True,
-    legend=dict(
-        bgcolor='rgba(0,0,0,0)',
-        bordercolor='rgba(255,255,255,0.1)',
-        borderwidth=1
-    ),
-    xaxis2_rangeslider_visible=False
-)
-
-# Update yaxis labels
-fig.update_yaxes(title_text="Price (USD)", row=1, col=1)
-fig.update_yaxes(title_text="Volume", row=2, col=1)
+# hidden indicators do not take part in the cache key
+fig, bar_size, candle_unit = cached_price_figure(symbol, timeframe, start, end, show_ma, show_bb,
+                                                 tuple(ma_periods) if show_ma else ())
+profiler.lap("price_chart.build")
+profiler.chart("price", fig)
 
 st.plotly_chart(fig, use_container_width=True, config={
     'modeBarButtonsToAdd': ['drawline', 'drawopenpath', 'drawclosedpath', 'drawcircle', 'drawrect', 'eraseshape'],
     'scrollZoom': True
 })
 
-# Advanced Analysis Section
-st.markdown("""
-    <div class="custom-container">
-        <h2 class="custom-header">📊 Advanced Analysis</h2>
-    </div>
-""", unsafe_allow_html=True)
-
-col1, col2 = st.columns(2)
-
-with col1:
-    # Returns Distribution
-    filtered_df['Returns'] = filtered_df['Close'].pct_change()
-    fig_returns = go.Figure()
-    
-    fig_returns.add_trace(go.Histogram(
-        x=filtered_df['Returns'],
-        nbinsx=50,
-        name='Returns',
-        marker_color='#1E88E5',
-        opacity=0.7
-    ))
-    
-    # Add normal distribution curve
-    returns_mean = filtered_df['Returns'].mean()
-    returns_std = filtered_df['Returns'].std()
-    x = np.linspace(returns_mean - 4*returns_std, returns_mean + 4*returns_std, 100)
-    y = norm.pdf(x, returns_mean, returns_std)
-    
-    fig_returns.add_trace(go.Scatter(
-        x=x,
-        y=y * len(filtered_df['Returns']) * (filtered_df['Returns'].max() - filtered_df['Returns'].min()) / 50,
-        mode='lines',
-        name='Normal Distribution',
-        line=dict(color='#00ff88', width=2)
-    ))
-    
-    fig_returns.update_layout(
-        title='Returns Distribution',
-        template='plotly_dark',
-        height=400,
-        showlegend=True,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)'
-    )
-    
-    st.plotly_chart(fig_returns, use_container_width=True)
-
-with col2:
-    # Volatility Analysis
-    window = 20
-    filtered_df['Volatility'] = filtered_df['Returns'].rolling(window=window).std() * np.sqrt(252) * 100
-    
-    fig_vol = go.Figure()
-    
-    fig_vol.add_trace(go.Scatter(
-        x=filtered_df['Date'],
-        y=filtered_df['Volatility'],
-        name='Rolling Volatility',
-        line=dict(color='#1E88E5', width=2)
-    ))
-    
-    fig_vol.update_layout(
-        title=f'{window}-Day Rolling Volatility',
-        template='plotly_dark',
-        height=400,
-        showlegend=True,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        yaxis_title='Annualized Volatility (%)'
-    )
-    
-    st.plotly_chart(fig_vol, use_container_width=True)
-
-# Statistics and Insights Section
-st.markdown("""
-    <div class="custom-container">
-        <h2 class="custom-header">📈 Key Statistics & Insights</h2>
-    </div>
-""", unsafe_allow_html=True)
-
-col1, col2, col3 = st.columns(3)
+if candle_unit != TIMEFRAMES[timeframe]["unit"]:
+    st.caption(f"Showing {candle_unit} candles from the intraday partitions"
+               + (f", {bar_size} merged per candle." if bar_size > 1 else "."))
+elif bar_size > 1:
+    st.caption(f"Each candle covers {bar_size} {TIMEFRAMES[timeframe]['unit']}s in this range; "
+               "narrow the date range for finer candles.")
+profiler.lap("price_chart.render")
+
+# Live feed: bars from the source go into a bounded ring buffer and, on a
+# timer, only this fragment reruns; the chart's traces are updated in place
+# rather than rebuilding the figure
+def new_live_feed(symbol):
+    if LIVE_SOURCE:
+        source = FileTailSource(LIVE_SOURCE)
+    else:
+        path = get_registry().path(symbol)
+        if is_partitioned(path):
+            # replay the latest month of intraday bars
+            store = PartitionedStore(path)
+            source = ReplaySource(bars=store.partition_frame(-1, RAW_LEVEL), bars_per_read=LIVE_BARS_PER_TICK)
+        else:
+            source = ReplaySource(path, bars_per_read=LIVE_BARS_PER_TICK)
+    return LiveFeed(source, LIVE_BUFFER_SIZE)
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_feed_section(symbol):
+    live = st.session_state.get("live_feed")
+    if live is None or live["symbol"] != symbol:
+        live = st.session_state["live_feed"] = {
+            "symbol": symbol, "feed": new_live_feed(symbol), "figure": live_price_figure()}
+    feed = live["feed"]
+    if feed.poll():
+        update_live_figure(live["figure"], feed.buffer.to_frame())
 
-with col1:
     st.markdown("""
-        <div class="metric-card">
-            <h3 style="color: #1E88E5;">Price Statistics</h3>
+        <div class="glass-card">
+            <h2 class="custom-header">📡 Live Feed</h2>
         </div>
     """, unsafe_allow_html=True)
-    
-    stats_df = pd.DataFrame({
-        'Metric': [
-            'Highest Price',
-            'Lowest Price',
-            'Average Price',
-            'Price Range',
-            'Current vs Avg'
-        ],
-        'Value': [
-            f"${filtered_df['High'].max():.2f}",
-            f"${filtered_df['Low'].min():.2f}",
-            f"${filtered_df['Close'].mean():.2f}",
-            f"${filtered_df['High'].max() - filtered_df['Low'].min():.2f}",
-            f"{((filtered_df['Close'].iloc[-1] / filtered_df['Close'].mean()) - 1) * 100:.1f}%"
-        ]
-    })
-    st.dataframe(stats_df, hide_index=True, use_container_width=True)
+    if not len(feed.buffer):
+        st.info("Waiting for the first bars...")
+        return
+
+    bars = feed.buffer.to_frame()
+    live_change = price_change_pct(bars['Close'])
+    cards = [
+        (f"${feed.buffer.last('Close'):,.2f}", "Last Price"),
+        (f"{live_change:,.2f}%", f"Change over {len(bars)} bars"),
+        (f"{feed.buffer.last('Volume'):,.0f}", "Last Volume"),
+        (f"{feed.buffer.total:,}", "Bars Received"),
+    ]
+    for col, (value, label) in zip(st.columns(4), cards):
+        with col:
+            st.markdown(f"""
+                <div class="metric-card">
+                    <div class="metric-value">{value}</div>
+                    <div class="metric-label">{label}</div>
+                </div>
+            """, unsafe_allow_html=True)
+
+    st.plotly_chart(live["figure"], use_container_width=True, key="live_chart")
+    if feed.source.exhausted:
+        st.caption("Replay finished.")
+
+if live_mode:
+    live_feed_section(symbol)
+    profiler.lap("live_feed")
+
+# The analysis sections below only compute once the user opens them, and
+# each runs as a fragment so its toggle reruns that section alone
 
-with col2:
+# Advanced Analysis Section
+@st.fragment
+def advanced_analysis(symbol, timeframe, start, end):
     st.markdown("""
-        <div class="metric-card">
-            <h3 style="color: #1E88E5;">Return Statistics</h3>
+        <div class="custom-container">
+            <h2 class="custom-header">📊 Advanced Analysis</h2>
         </div>
     """, unsafe_allow_html=True)
-    
-    # Calculate additional return metrics
-    daily_returns = filtered_df['Returns'].dropna()
-    annualized_return = np.mean(daily_returns) * 252 * 100
-    sharpe_ratio = np.mean(daily_returns) / np.std(daily_returns) * np.sqrt(252)
-    
-    returns_stats = pd.DataFrame({
-        'Metric': [
-            'Daily Returns Mean',
-            'Daily Returns Std',
-            'Annualized Return',
-            'Sharpe Ratio',
-            'Positive Days %'
-        ],
-        'Value': [
-            f"{daily_returns.mean()*100:.2f}%",
-            f"{daily_returns.std()*100:.2f}%",
-            f"{annualized_return:.2f}%",
-            f"{sharpe_ratio:.2f}",
-            f"{(daily_returns > 0).mean()*100:.1f}%"
-        ]
-    })
-    st.dataframe(returns_stats, hide_index=True, use_container_width=True)
+    if not st.toggle("Show returns distribution and volatility", key="show_advanced_analysis"):
+        return
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        fig_returns = cached_returns_figure(symbol, timeframe, start, end)
+        profiler.lap("returns_chart.build")
+        profiler.chart("returns", fig_returns)
+        st.plotly_chart(fig_returns, use_container_width=True)
+        profiler.lap("returns_chart.render")
+
+    with col2:
+        fig_vol = cached_volatility_figure(symbol, timeframe, start, end)
+        profiler.lap("volatility_chart.build")
+        profiler.chart("volatility", fig_vol)
+        st.plotly_chart(fig_vol, use_container_width=True)
+        profiler.lap("volatility_chart.render")
+
+    unit = TIMEFRAMES[timeframe]["unit"]
+    window = st.select_slider(f"Rolling risk window ({unit}s)", options=list(RISK_WINDOWS), value=DEFAULT_RISK_WINDOW,
+                              key="risk_window")
+    fig_risk = cached_rolling_risk_figure(symbol, timeframe, start, end, window)
+    profiler.lap("risk_chart.build")
+    profiler.chart("risk", fig_risk)
+    st.plotly_chart(fig_risk, use_container_width=True)
+    profiler.lap("risk_chart.render")
+
+advanced_analysis(symbol, timeframe, start, end)
 
-with col3:
+# Statistics and Insights Section
+@st.fragment
+def key_statistics(symbol, timeframe, start, end):
     st.markdown("""
-        <div class="metric-card">
-            <h3 style="color: #1E88E5;">Volume Analysis</h3>
+        <div class="custom-container">
+            <h2 class="custom-header">📈 Key Statistics & Insights</h2>
         </div>
     """, unsafe_allow_html=True)
-    
-    volume_stats = pd.DataFrame({
-        'Metric': [
-            'Highest Volume',
-            'Lowest Volume',
-            'Avg Daily Volume',
-            'Volume Trend',
-            'Volume Volatility'
-        ],
-        'Value': [
-            f"{filtered_df['Volume'].max():,.0f}",
-            f"{filtered_df['Volume'].min():,.0f}",
-            f"{filtered_df['Volume'].mean():,.0f}",
-            f"{((filtered_df['Volume'].tail(5).mean() / filtered_df['Volume'].head(5).mean()) - 1) * 100:.1f}%",
-            f"{filtered_df['Volume'].std() / filtered_df['Volume'].mean() * 100:.1f}%"
-        ]
-    })
-    st.dataframe(volume_stats, hide_index=True, use_container_width=True)
+    if not st.toggle("Show price, return and volume statistics", key="show_key_statistics"):
+        return
 
-# Technical Patterns Section
-st.markdown("""
-    <div class="custom-container">
-        <h2 class="custom-header">🔍 Technical Analysis Insights</h2>
-    </div>
-""", unsafe_allow_html=True)
-
-def calculate_rsi(data, periods=14):
-    close_delta = data['Close'].diff()
-    gain = (close_delta.where(close_delta > 0, 0)).rolling(window=periods).mean()
-    loss = (-close_delta.where(close_delta < 0, 0)).rolling(window=periods).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
-
-# Calculate technical indicators
-filtered_df['RSI'] = calculate_rsi(filtered_df)
-filtered_df['SMA_20'] = filtered_df['Close'].rolling(window=20).mean()
-filtered_df['SMA_50'] = filtered_df['Close'].rolling(window=50).mean()
-
-# Create technical analysis signals
-signals = []
-
-# RSI signals
-last_rsi = filtered_df['RSI'].iloc[-1]
-if last_rsi > 70:
-    signals.append(("RSI Overbought", "warning"))
-elif last_rsi < 30:
-    signals.append(("RSI Oversold", "success"))
-
-# Moving Average signals
-if filtered_df['SMA_20'].iloc[-1] > filtered_df['SMA_50'].iloc[-1] and \
-   filtered_df['SMA_20'].iloc[-2] <= filtered_df['SMA_50'].iloc[-2]:
-    signals.append(("Golden Cross Detected", "success"))
-elif filtered_df['SMA_20'].iloc[-1] < filtered_df['SMA_50'].iloc[-1] and \
-     filtered_df['SMA_20'].iloc[-2] >= filtered_df['SMA_50'].iloc[-2]:
-    signals.append(("Death Cross Detected", "warning"))
-
-# Display technical signals
-col1, col2 = st.columns([2, 1])
+    col1, col2, col3 = st.columns(3)
+    frame = load_timeframe(symbol, timeframe)
+    lo, hi = date_bounds(date_values(frame), start, end)
+    range_stats = get_range_stats(symbol, timeframe, get_registry().version(symbol))
+    stats_df, returns_stats, volume_stats = stats_tables(range_stats, lo, hi, timeframe)
 
-with col1:
-    # RSI Chart
-    fig_rsi = go.Figure()
-    
-    fig_rsi.add_trace(go.Scatter(
-        x=filtered_df['Date'],
-        y=filtered_df['RSI'],
-        name='RSI',
-        line=dict(color='#1E88E5', width=2)
-    ))
-    
-   
-    fig_rsi.add_hline(y=70, line_dash="dash", line_color="red", opacity=0.5)
-    fig_rsi.add_hline(y=30, line_dash="dash", line_color="green", opacity=0.5)
-    
-    fig_rsi.update_layout(
-        title='Relative Strength Index (RSI)',
-        template='plotly_dark',
-        height=300,
-        showlegend=True,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        yaxis_title='RSI'
-    )
-    
-    st.plotly_chart(fig_rsi, use_container_width=True)
+    with col1:
+        st.markdown("""
+            <div class="metric-card">
+                <h3 style="color: #1E88E5;">Price Statistics</h3>
+            </div>
+        """, unsafe_allow_html=True)
+        st.dataframe(stats_df, hide_index=True, use_container_width=True)
 
-with col2:
-    st.markdown("""
-        <div class="metric-card" style="height: 300px; overflow-y: auto;">
-            <h3 style="color: #1E88E5;">Technical Signals</h3>
-    """, unsafe_allow_html=True)
-    
-    for signal, signal_type in signals:
-        color = "#00ff88" if signal_type == "success" else "#ff4444"
-        st.markdown(f"""
-            <div style="margin: 10px 0; padding: 10px; border-radius: 5px; background-color: rgba(0,0,0,0.2);">
-                <span style="color: {color};">●</span> {signal}
+    with col2:
+        st.markdown("""
+            <div class="metric-card">
+                <h3 style="color: #1E88E5;">Return Statistics</h3>
             </div>
         """, unsafe_allow_html=True)
-    
-    if not signals:
+        st.dataframe(returns_stats, hide_index=True, use_container_width=True)
+
+    with col3:
         st.markdown("""
-            <div style="margin: 10px 0; padding: 10px; border-radius: 5px; background-color: rgba(0,0,0,0.2);">
-                No significant technical signals detected
+            <div class="metric-card">
+                <h3 style="color: #1E88E5;">Volume Analysis</h3>
             </div>
         """, unsafe_allow_html=True)
-    
-    st.markdown("</div>", unsafe_allow_html=True)
+        st.dataframe(volume_stats, hide_index=True, use_container_width=True)
+    profiler.lap("statistics")
+
+key_statistics(symbol, timeframe, start, end)
+
+# Technical Patterns Section
+@st.fragment
+def technical_insights(symbol, timeframe, start, end, filtered_df):
+    st.markdown("""
+        <div class="custom-container">
+            <h2 class="custom-header">🔍 Technical Analysis Insights</h2>
+        </div>
+    """, unsafe_allow_html=True)
+    if not st.toggle("Show RSI and technical signals", key="show_technical_insights"):
+        return
+
+    # Create technical analysis signals
+    signals = technical_signals(filtered_df['RSI'], filtered_df['MA_20'], filtered_df['MA_50'])
+    profiler.lap("signals")
+
+    # Display technical signals
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        fig_rsi = cached_rsi_figure(symbol, timeframe, start, end)
+        profiler.lap("rsi_chart.build")
+        profiler.chart("rsi", fig_rsi)
+        st.plotly_chart(fig_rsi, use_container_width=True)
+        profiler.lap("rsi_chart.render")
+
+    with col2:
+        st.markdown("""
+            <div class="metric-card" style="height: 300px; overflow-y: auto;">
+                <h3 style="color: #1E88E5;">Technical Signals</h3>
+        """, unsafe_allow_html=True)
+        
+        for signal, signal_type in signals:
+            color = "#00ff88" if signal_type == "success" else "#ff4444"
+            st.markdown(f"""
+                <div style="margin: 10px 0; padding: 10px; border-radius: 5px; background-color: rgba(0,0,0,0.2);">
+                    <span style="color: {color};">●</span> {signal}
+                </div>
+            """, unsafe_allow_html=True)
+        
+        if not signals:
+            st.markdown("""
+                <div style="margin: 10px 0; padding: 10px; border-radius: 5px; background-color: rgba(0,0,0,0.2);">
+                    No significant technical signals detected
+                </div>
+            """, unsafe_allow_html=True)
+        
+        st.markdown("</div>", unsafe_allow_html=True)
+
+technical_insights(symbol, timeframe, start, end, filtered_df)
+
+# Strategy Backtest Section
+@st.fragment
+def strategy_backtest(symbol, timeframe, start, end, rule, params):
+    st.markdown("""
+        <div class="custom-container">
+            <h2 class="custom-header">🧪 Strategy Backtest</h2>
+        </div>
+    """, unsafe_allow_html=True)
+    if not st.toggle("Show equity curve, drawdown and trades", key="show_strategy_backtest"):
+        return
+
+    fig_backtest, result = cached_backtest(symbol, timeframe, start, end, rule, params)
+    profiler.lap("backtest.build")
+    profiler.chart("backtest", fig_backtest)
+
+    trades = result['trades']
+    cards = [
+        (f"{result['total_return_pct']:,.2f}%", "Strategy Return"),
+        (f"{result['buy_hold_return_pct']:,.2f}%", "Buy & Hold Return"),
+        (f"{result['max_drawdown_pct']:,.2f}%", "Max Drawdown"),
+        (f"{result['hit_rate_pct']:,.1f}%" if len(trades) else "–", f"Hit Rate ({len(trades)} trades)"),
+        (f"{result['sharpe']:,.2f}", "Sharpe Ratio"),
+    ]
+    for col, (value, label) in zip(st.columns(len(cards)), cards):
+        with col:
+            st.markdown(f"""
+                <div class="metric-card">
+                    <div class="metric-value">{value}</div>
+                    <div class="metric-label">{label}</div>
+                </div>
+            """, unsafe_allow_html=True)
+
+    st.plotly_chart(fig_backtest, use_container_width=True)
+    st.dataframe(trades, hide_index=True, use_container_width=True)
+    profiler.lap("backtest.render")
+
+strategy_backtest(symbol, timeframe, start, end, backtest_rule, tuple(backtest_params))
+
+# Parameter Sweep Section
+@st.fragment
+def parameter_sweep(symbol, timeframe, start, end):
+    st.markdown("""
+        <div class="custom-container">
+            <h2 class="custom-header">🗺️ Parameter Sweep</h2>
+        </div>
+    """, unsafe_allow_html=True)
+    if not st.toggle("Show Sharpe ratio across strategy parameters", key="show_parameter_sweep"):
+        return
+
+    kind = st.radio("Sweep", list(SWEEPS), horizontal=True, key="sweep_kind")
+    with st.spinner("Sweeping parameters..."):
+        fig_sweep, grid = cached_sweep(symbol, timeframe, start, end, kind)
+    profiler.lap("sweep.build")
+    profiler.chart("sweep", fig_sweep)
+
+    best_row, best_column = grid.stack().idxmax()
+    st.plotly_chart(fig_sweep, use_container_width=True)
+    st.caption(f"Best Sharpe {grid.loc[best_row, best_column]:.2f} at {grid.index.name} {best_row}, "
+               f"{grid.columns.name} {best_column} over {grid.count().sum():,} combinations.")
+    profiler.lap("sweep.render")
+
+parameter_sweep(symbol, timeframe, start, end)
+
+# Monte Carlo Section
+@st.fragment
+def monte_carlo(symbol, timeframe, start, end):
+    st.markdown("""
+        <div class="custom-container">
+            <h2 class="custom-header">🎲 Monte Carlo Forecast</h2>
+        </div>
+    """, unsafe_allow_html=True)
+    if not st.toggle("Show simulated price paths and value at risk", key="show_monte_carlo"):
+        return
+    if len(_window(symbol, timeframe, start, end)) < 3:
+        st.info("Select a longer date range to simulate from its returns.")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        method = st.radio("Model", METHODS, horizontal=True, key="mc_method",
+                          help="GBM fits a normal distribution to the window's returns; "
+                               "Bootstrap resamples the returns themselves")
+    with col2:
+        unit = TIMEFRAMES[timeframe]["unit"]
+        horizon = st.select_slider(f"Horizon ({unit}s)", options=[5, 21, 63, 126, 252], value=63,
+                                   key="mc_horizon")
+
+    with st.spinner(f"Simulating {MC_PATHS:,} paths..."):
+        fig_fan, risk = cached_simulation(symbol, timeframe, start, end, method, horizon)
+    profiler.lap("monte_carlo.build")
+    profiler.chart("monte_carlo", fig_fan)
+
+    cards = []
+    for level, values in risk.items():
+        cards.append((f"{values['var'] * 100:,.2f}%", f"{level:.0%} VaR"))
+        cards.append((f"{values['cvar'] * 100:,.2f}%", f"{level:.0%} CVaR"))
+    for col, (value, label) in zip(st.columns(len(cards)), cards):
+        with col:
+            st.markdown(f"""
+                <div class="metric-card">
+                    <div class="metric-value">{value}</div>
+                    <div class="metric-label">{label}</div>
+                </div>
+            """, unsafe_allow_html=True)
+
+    st.plotly_chart(fig_fan, use_container_width=True)
+    st.caption(f"{MC_PATHS:,} {method} paths; VaR and CVaR are losses over the {horizon}-{unit} horizon.")
+    profiler.lap("monte_carlo.render")
+
+monte_carlo(symbol, timeframe, start, end)
+
+# Peer Comparison Section
+@st.fragment
+def peer_comparison(symbol, timeframe, start, end):
+    st.markdown("""
+        <div class="custom-container">
+            <h2 class="custom-header">🔗 Peer Comparison</h2>
+        </div>
+    """, unsafe_allow_html=True)
+    if not st.toggle("Show correlation, beta and relative performance against peers", key="show_peer_comparison"):
+        return
+    candidates = [s for s in get_registry().symbols() if s != symbol]
+    if not candidates:
+        st.info(f"Add peer or index csvs (same columns as {symbol}'s) to the data directory to compare them.")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        peers = st.multiselect("Peers and indices", candidates, default=candidates[:4], key="peers")
+    with col2:
+        unit = TIMEFRAMES[timeframe]["unit"]
+        window = st.select_slider(f"Correlation window ({unit}s)", options=list(CORRELATION_WINDOWS),
+                                  value=DEFAULT_RISK_WINDOW, key="peer_window")
+    if not peers:
+        return
+
+    versions = tuple(get_registry().version(s) for s in (symbol, *peers))
+    figures = cached_peer_figures(symbol, tuple(peers), versions, timeframe, start, end, window)
+    profiler.lap("peers.build")
+    if figures is None:
+        st.info("The selected symbols share fewer than two bars in this date range.")
+        return
+    fig_performance, fig_comovement, fig_matrix, shared = figures
+    profiler.chart("peers", fig_comovement)
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        st.plotly_chart(fig_performance, use_container_width=True)
+    with col2:
+        st.plotly_chart(fig_matrix, use_container_width=True)
+    st.plotly_chart(fig_comovement, use_container_width=True)
+    st.caption(f"Aligned on the {shared:,} {unit}s all {len(peers) + 1} symbols share in this range.")
+    profiler.lap("peers.render")
+
+peer_comparison(symbol, timeframe, start, end)
 
 # Footer info
 st.markdown("""
     <div style="text-align: center; margin-top: 30px; padding: 20px; background-color: rgba(0,0,0,0.2); border-radius: 10px;">
         <p style="color: #888888;">BMW Stock Analytics Dashboard • Last Updated: {}</p>
     </div>
-""".format(datetime.now().strftime("%Y-%m-%d %H:%M:%S")), unsafe_allow_html=True)
\ No newline at end of file
+""".format(datetime.now().strftime("%Y-%m-%d %H:%M:%S")), unsafe_allow_html=True)
+profiler.lap("footer")
+
+# Rerun profile panel and structured log line
+if profiler.enabled:
+    with st.sidebar.expander("⏱️ Rerun Profile"):
+        st.caption(f"Total {profiler.total_ms():,.1f} ms")
+        st.dataframe(profiler.section_table(), hide_index=True, use_container_width=True)
+        st.dataframe(profiler.chart_table(), hide_index=True, use_container_width=True)
+    profiler.log(symbol=symbol, date_preset=date_preset, start=start, end=end,
+                 show_ma=show_ma, show_bb=show_bb, ma_periods=ma_periods)
@@ -0,0 +1,29 @@
+import numpy as np
+
+# Array helpers shared by the vectorized analytics modules (analytics,
+# backtest, risk, range_stats, simulation, correlation).
+
+
+# float64 values of an array, Series or list, without copying when they
+# already are
+def as_float_array(x):
+    return np.asarray(x, dtype=np.float64)
+
+
+# sums over every full window of `window` rows (along the first axis), from
+# a running sum; row i sums x[i:i + window]. Callers that turn the sums into
+# variances center x first: running sums of squares or products of
+# uncentered values lose their precision to cancellation
+def window_sums(x, window):
+    csum = np.cumsum(x, axis=0)
+    csum = np.concatenate((np.zeros((1,) + csum.shape[1:]), csum))
+    return csum[window:] - csum[:-window]
+
+
+# per-window results aligned with the bars they end on: `head` bars that
+# start no window (e.g. the first bar, which has no return) and the
+# window - 1 bars before the first full window are NaN
+def nan_padded(values, window, head=0):
+    out = np.full((head + window - 1 + len(values),) + values.shape[1:], np.nan)
+    out[head + window - 1:] = values
+    return out
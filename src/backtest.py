@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+from analytics import RSI_OVERBOUGHT, RSI_OVERSOLD
+from arrays import as_float_array
+from indicators import TRADING_DAYS
+
+# Vectorized long/flat backtests of the dashboard's technical signals. A
+# rule turns the history into a 0/1 signal per bar using data up to that
+# bar's close; the position is taken at that close, so bar t earns
+# signal[t-1] * return[t] and no bar trades on its own future. Like
+# analytics, everything here is headless numpy.
+
+
+# simple moving average from a running sum, NaN until `period` bars exist
+def moving_average(close, period):
+    close = as_float_array(close)
+    ma = np.full(len(close), np.nan)
+    if period <= len(close):
+        csum = np.cumsum(np.insert(close, 0, 0.0))
+        ma[period - 1:] = (csum[period:] - csum[:-period]) / period
+    return ma
+
+
+# long while the fast average is above the slow one: in at a golden cross,
+# out at the next death cross
+def ma_cross_signal(close, fast, slow):
+    return (moving_average(close, fast) > moving_average(close, slow)).astype(np.int8)
+
+
+# long from a close with RSI below `oversold` until a close with RSI above
+# `overbought`
+def rsi_signal(rsi_values, oversold=RSI_OVERSOLD, overbought=RSI_OVERBOUGHT):
+    rsi_values = as_float_array(rsi_values)
+    state = np.where(rsi_values < oversold, 1, np.where(rsi_values > overbought, 0, -1))
+    # carry the latest entry or exit forward through the bars in between
+    latest = np.maximum.accumulate(np.where(state >= 0, np.arange(len(state)), -1))
+    return np.where(latest >= 0, state[latest], 0).astype(np.int8)
+
+
+# annualized Sharpe ratio of holding `signal[t]` through `returns[t]`,
+# without building the equity curve or trade list (for parameter sweeps)
+def signal_sharpe(returns, signal, periods_per_year=TRADING_DAYS):
+    strategy_returns = returns * signal
+    std = np.std(strategy_returns)
+    # a strategy that never moves has no risk-adjusted return
+    if not std > 0:
+        return 0.0
+    return np.mean(strategy_returns) / std * np.sqrt(periods_per_year)
+
+
+# one row per round trip; a position still held on the last bar is closed
+# there and flagged as open
+def trade_list(dates, close, signal):
+    close = as_float_array(close)
+    change = np.diff(np.concatenate(([0], signal, [0])))
+    entries = np.flatnonzero(change == 1)
+    exits = np.flatnonzero(change == -1)
+    still_open = exits == len(close)
+    exits = np.minimum(exits, len(close) - 1)
+    dates = np.asarray(dates)
+    return pd.DataFrame({
+        'Entry': dates[entries],
+        'Exit': dates[exits],
+        'Entry Price': close[entries],
+        'Exit Price': close[exits],
+        'Bars': exits - entries,
+        'Return %': (close[exits] / close[entries] - 1) * 100,
+        'Open': still_open,
+    })
+
+
+# Backtest a signal over aligned dates and closes. Bars before the first
+# one are not seen, so a signal already on at the start enters at the first
+# close.
+def run_backtest(dates, close, signal, periods_per_year=TRADING_DAYS):
+    close = as_float_array(close)
+    signal = np.asarray(signal, dtype=np.int8)
+
+    held = np.zeros(len(close))
+    held[1:] = signal[:-1]
+    returns = np.zeros(len(close))
+    returns[1:] = close[1:] / close[:-1] - 1
+    strategy_returns = held * returns
+
+    equity = np.cumprod(1 + strategy_returns)
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+    trades = trade_list(dates, close, signal)
+
+    return {
+        'equity': equity,
+        'drawdown': drawdown,
+        'trades': trades,
+        'total_return_pct': (equity[-1] - 1) * 100,
+        'buy_hold_return_pct': (close[-1] / close[0] - 1) * 100,
+        'max_drawdown_pct': drawdown.min() * 100,
+        'hit_rate_pct': np.mean(trades['Return %'] > 0) * 100 if len(trades) else np.nan,
+        'exposure_pct': held.mean() * 100,
+        'sharpe': signal_sharpe(returns[1:], signal[:-1], periods_per_year),
+    }
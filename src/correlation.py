@@ -0,0 +1,74 @@
+import functools
+
+import numpy as np
+
+from arrays import as_float_array, nan_padded, window_sums
+from date_index import date_values
+from risk import RISK_WINDOWS
+
+# Cross-series analytics for a universe of symbols: the selected ticker
+# plus peers and indices stored in the same csv schema. Series are aligned
+# on the dates they all share by binary search over their sorted Date
+# columns; every frame keeps its own (memory-mapped) columns and only the
+# positions of the shared dates are stored, so a column is gathered only
+# when a metric needs it. Rolling covariances come from running sums of the
+# returns and of their pairwise products, so the correlation matrix and
+# betas of every window over the whole history take a few vectorized
+# passes. Every rolling result is NaN until a full window of returns exists.
+
+CORRELATION_WINDOWS = RISK_WINDOWS
+
+
+class AlignedUniverse:
+    # frames maps each symbol to a date-sorted frame; the first symbol is
+    # the one the others are compared with
+    def __init__(self, frames):
+        self.symbols = list(frames)
+        self._frames = frames
+        dates = [date_values(frame) for frame in frames.values()]
+        self.dates = functools.reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), dates)
+        self.positions = {symbol: np.searchsorted(symbol_dates, self.dates)
+                          for symbol, symbol_dates in zip(self.symbols, dates)}
+
+    def __len__(self):
+        return len(self.dates)
+
+    # one column of every series on the shared dates, a series per column
+    def matrix(self, column='Close'):
+        return np.column_stack([as_float_array(self._frames[symbol][column])[self.positions[symbol]]
+                                for symbol in self.symbols])
+
+
+# covariance matrices of the returns (one series per column) in every full
+# window, shaped (windows, series, series)
+def rolling_covariance(returns, window):
+    centered = returns - returns.mean(axis=0)
+    sums = window_sums(centered, window)
+    products = window_sums(centered[:, :, None] * centered[:, None, :], window)
+    return (products - sums[:, :, None] * sums[:, None, :] / window) / (window - 1)
+
+
+# Rolling correlation and beta matrices of closes (one series per column),
+# aligned with the closes: correlation[t, i, j] between series i and j, and
+# beta[t, i, j] the sensitivity of series i to series j, over the `window`
+# returns up to bar t
+def rolling_comovement(closes, window):
+    closes = as_float_array(closes)
+    returns = closes[1:] / closes[:-1] - 1
+    if len(returns) < window:
+        empty = np.full(closes.shape + closes.shape[1:], np.nan)
+        return empty, empty.copy()
+
+    cov = rolling_covariance(returns, window)
+    variance = np.diagonal(cov, axis1=1, axis2=2)
+    std = np.sqrt(np.maximum(variance, 0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation = np.clip(cov / (std[:, :, None] * std[:, None, :]), -1, 1)
+        beta = cov / variance[:, None, :]
+    return nan_padded(correlation, window, 1), nan_padded(beta, window, 1)
+
+
+# closes of bars lo..hi-1 rebased to 100 at the first bar of the range
+def rebased_performance(closes, lo, hi):
+    closes = as_float_array(closes)
+    return closes[lo:hi] / closes[lo] * 100
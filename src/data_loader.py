@@ -0,0 +1,399 @@
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from numpy.lib import format as npy_format
+
+DATA_DIR = 'data'
+DATA_PATH = os.path.join(DATA_DIR, 'BMW_Data.csv')
+CACHE_DIR = os.path.join(DATA_DIR, '.cache')
+# intraday symbols too large for one frame, split into monthly partitions
+# (see partitions.py)
+PARTITIONS_DIR = os.path.join(DATA_DIR, 'partitions')
+# data files are named <SYMBOL>_Data.csv (or just <SYMBOL>.csv)
+SYMBOL_SUFFIX = '_Data'
+
+# column layout of the OHLCV files and the dtype each column is stored as
+COLUMN_DTYPES = {
+    'Date': 'datetime64[ns]',
+    'Adj_Close': 'float64',
+    'Close': 'float64',
+    'High': 'float64',
+    'Low': 'float64',
+    'Open': 'float64',
+    'Volume': 'int64',
+}
+
+META_FILE = 'meta.json'
+SIDECAR_VERSION = 2
+# appends recorded in a sidecar's history before it is folded into one
+# segment (one full re-hash)
+MAX_SEGMENTS = 64
+
+
+# hash the csv contents (bytes start..end, by default all of them) in
+# blocks so large files are never fully in memory
+def file_digest(path, start=0, end=None, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = float('inf') if end is None else end - start
+        while remaining > 0:
+            block = f.read(int(min(block_size, remaining)))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+def sidecar_dir(csv_path, cache_dir=CACHE_DIR):
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(cache_dir, name)
+
+
+def read_csv(csv_path):
+    numeric = {col: dtype for col, dtype in COLUMN_DTYPES.items() if col != 'Date'}
+    df = pd.read_csv(csv_path, dtype=numeric, parse_dates=['Date'])
+    # date slicing binary-searches the Date column, so keep it sorted
+    if not df['Date'].is_monotonic_increasing:
+        df = df.sort_values('Date', kind='stable', ignore_index=True)
+    return df[list(COLUMN_DTYPES)]
+
+
+def read_meta(directory):
+    try:
+        with open(os.path.join(directory, META_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_meta(directory, meta):
+    tmp_path = os.path.join(directory, META_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(directory, META_FILE))
+
+
+# the sidecar is fresh when size and mtime match; if only the mtime moved
+# (touch, checkout) the content hash decides and the meta is refreshed
+def _sidecar_is_fresh(csv_path, directory, meta):
+    if meta is None or meta.get('version') != SIDECAR_VERSION:
+        return False
+    if any(not os.path.exists(os.path.join(directory, f'{col}.npy')) for col in COLUMN_DTYPES):
+        return False
+    stat = os.stat(csv_path)
+    if meta['size'] != stat.st_size:
+        return False
+    if meta['mtime_ns'] == stat.st_mtime_ns:
+        return True
+    start = 0
+    for segment in meta['segments']:
+        if segment['sha256'] != file_digest(csv_path, start, segment['end']):
+            return False
+        start = segment['end']
+    meta['mtime_ns'] = meta['segments'][-1]['mtime_ns'] = stat.st_mtime_ns
+    try:
+        write_meta(directory, meta)
+    except OSError:
+        pass
+    return True
+
+
+# The csv is described as a history of segments: the bytes the sidecar was
+# built from, then one per append_rows call, each with the byte offset,
+# mtime and row count the file had after it and a hash of its own bytes.
+# Appending only hashes the new bytes, and a loaded frame whose (size,
+# mtime) is a segment boundary is known to be a prefix of the current file.
+def _segment(csv_path, start, rows):
+    stat = os.stat(csv_path)
+    return {'end': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'rows': rows,
+            'sha256': file_digest(csv_path, start, stat.st_size)}
+
+
+def _sidecar_meta(csv_path, rows, segments=()):
+    segments = list(segments)
+    start = segments[-1]['end'] if segments else 0
+    segments.append(_segment(csv_path, start, rows))
+    if len(segments) > MAX_SEGMENTS:
+        segments = [_segment(csv_path, 0, rows)]
+    return {
+        'version': SIDECAR_VERSION,
+        'source': os.path.abspath(csv_path),
+        'size': segments[-1]['end'],
+        'mtime_ns': segments[-1]['mtime_ns'],
+        'rows': rows,
+        'segments': segments,
+        'columns': COLUMN_DTYPES,
+    }
+
+
+# True when the csv's sidecar records that the file has only had bars
+# appended since it was `version` (size, mtime_ns) with `rows` rows
+def is_appended_since(csv_path, version, rows, cache_dir=CACHE_DIR):
+    meta = read_meta(sidecar_dir(csv_path, cache_dir))
+    if meta is None or meta.get('version') != SIDECAR_VERSION:
+        return False
+    stat = os.stat(csv_path)
+    if (meta['size'], meta['mtime_ns']) != (stat.st_size, stat.st_mtime_ns):
+        return False
+    return any((segment['end'], segment['mtime_ns'], segment['rows']) == (*version, rows)
+               for segment in meta['segments'])
+
+
+def build_sidecar(csv_path, cache_dir=CACHE_DIR):
+    directory = sidecar_dir(csv_path, cache_dir)
+    os.makedirs(directory, exist_ok=True)
+    before = os.stat(csv_path)
+    df = read_csv(csv_path)
+
+    # columns are written first and the meta last, so a crash mid-build
+    # leaves a sidecar that is simply treated as stale
+    for col, dtype in COLUMN_DTYPES.items():
+        tmp_path = os.path.join(directory, f'{col}.tmp.npy')
+        np.save(tmp_path, df[col].to_numpy(dtype=dtype))
+        os.replace(tmp_path, os.path.join(directory, f'{col}.npy'))
+
+    meta = _sidecar_meta(csv_path, len(df))
+    # a csv written to while it was read gets no meta, so columns read from a
+    # half-written file are rebuilt on the next load instead of looking fresh
+    if (meta['size'], meta['mtime_ns']) == (before.st_size, before.st_mtime_ns):
+        write_meta(directory, meta)
+    else:
+        try:
+            os.remove(os.path.join(directory, META_FILE))
+        except OSError:
+            pass
+    return df
+
+
+def read_sidecar(directory, mmap=True):
+    mode = 'r' if mmap else None
+    columns = {col: np.load(os.path.join(directory, f'{col}.npy'), mmap_mode=mode)
+               for col in COLUMN_DTYPES}
+    # copy=False keeps every column backed by its memory-mapped file
+    return pd.DataFrame(columns, copy=False)
+
+
+# load an OHLCV csv through its columnar sidecar, rebuilding it when stale
+def load_ohlcv(csv_path=DATA_PATH, cache_dir=CACHE_DIR, mmap=True):
+    directory = sidecar_dir(csv_path, cache_dir)
+    if _sidecar_is_fresh(csv_path, directory, read_meta(directory)):
+        try:
+            return read_sidecar(directory, mmap=mmap)
+        except (OSError, ValueError):
+            pass
+    try:
+        return build_sidecar(csv_path, cache_dir)
+    except OSError:
+        # read-only checkout: serve straight from the csv
+        return read_csv(csv_path)
+
+
+
+# check bars to be appended after last_date: full schema, no missing or
+# duplicate dates, strictly increasing; returns them typed like read_csv
+def validate_new_rows(new_rows, last_date=None):
+    missing = [col for col in COLUMN_DTYPES if col not in new_rows.columns]
+    if missing:
+        raise ValueError(f'new rows are missing columns: {", ".join(missing)}')
+
+    rows = new_rows[list(COLUMN_DTYPES)].reset_index(drop=True)
+    rows['Date'] = pd.to_datetime(rows['Date'])
+    if rows['Date'].isna().any():
+        raise ValueError('new rows have missing dates')
+    if rows['Date'].duplicated().any():
+        raise ValueError('new rows contain duplicate dates')
+    if not rows['Date'].is_monotonic_increasing:
+        raise ValueError('new rows must be in increasing date order')
+    if len(rows) and last_date is not None and rows['Date'].iloc[0] <= last_date:
+        raise ValueError(f'new rows must start after the last date {pd.Timestamp(last_date).date()}')
+    return rows.astype(COLUMN_DTYPES)
+
+
+# grow a 1-d .npy file in place: append the data, then rewrite the header
+# with the new length (it is padded, so it almost always keeps its size)
+def _append_npy(path, values):
+    with open(path, 'r+b') as f:
+        version = npy_format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = npy_format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = npy_format.read_array_header_2_0(f)
+        data_offset = f.tell()
+
+        header = io.BytesIO()
+        new_header = {'descr': npy_format.dtype_to_descr(dtype), 'fortran_order': fortran_order,
+                      'shape': (shape[0] + len(values),)}
+        if version == (1, 0):
+            npy_format.write_array_header_1_0(header, new_header)
+        else:
+            npy_format.write_array_header_2_0(header, new_header)
+
+        if len(header.getvalue()) == data_offset:
+            f.seek(0, os.SEEK_END)
+            f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+            f.seek(0)
+            f.write(header.getvalue())
+            return
+
+    # header outgrew its padding: rewrite beside the old file so live
+    # memory maps of it stay valid
+    tmp_path = path[:-len('.npy')] + '.tmp.npy'
+    np.save(tmp_path, np.concatenate([np.load(path), values.astype(dtype)]))
+    os.replace(tmp_path, path)
+
+
+# append validated bars to an OHLCV csv and extend its sidecar columns in
+# place instead of re-parsing the whole file; returns the appended rows
+def append_rows(csv_path, new_rows, cache_dir=CACHE_DIR):
+    existing = load_ohlcv(csv_path, cache_dir)
+    last_date = existing['Date'].iloc[-1] if len(existing) else None
+    rows = validate_new_rows(new_rows, last_date)
+    if rows.empty:
+        return rows
+
+    with open(csv_path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+        f.write(rows.to_csv(header=False, index=False, date_format='%Y-%m-%d').encode())
+
+    directory = sidecar_dir(csv_path, cache_dir)
+    meta = read_meta(directory)
+    if meta is None or meta.get('version') != SIDECAR_VERSION or meta.get('rows') != len(existing):
+        # no usable sidecar (e.g. read-only cache); the next load rebuilds it
+        return rows
+    # columns first and meta last, as in build_sidecar; only the appended
+    # bytes are hashed
+    for col, dtype in COLUMN_DTYPES.items():
+        _append_npy(os.path.join(directory, f'{col}.npy'), rows[col].to_numpy(dtype=dtype))
+    write_meta(directory, _sidecar_meta(csv_path, len(existing) + len(rows), meta['segments']))
+    return rows
+
+
+def _concat_rows(df, new_rows):
+    return pd.concat([df, new_rows], ignore_index=True)
+
+
+def symbol_for(path):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return name[:-len(SYMBOL_SUFFIX)] if name.endswith(SYMBOL_SUFFIX) else name
+
+
+# what decides whether a loaded symbol is stale: the size and mtime of its
+# csv (any rewrite, even at the same size, moves the mtime) or, for
+# partitioned symbols, of their meta
+def _data_version(path):
+    if os.path.isdir(path):
+        path = os.path.join(path, META_FILE)
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+# maps ticker symbols to the csv files of a data directory (and the
+# partitioned stores under its partitions/ directory) and keeps only the
+# most recently used frames loaded, so memory does not grow with the
+# number of symbols; listing symbols never reads any data.
+# When a loaded symbol's file has only had bars appended since it was
+# loaded (from this or another process, as recorded by append_rows) only
+# the new bars are passed to `extender`; any other change reloads it.
+class SymbolRegistry:
+    def __init__(self, data_dir=DATA_DIR, max_loaded=8, loader=load_ohlcv,
+                 extender=_concat_rows, cache_dir=CACHE_DIR):
+        self.data_dir = data_dir
+        self.partitions_dir = os.path.join(data_dir, os.path.basename(PARTITIONS_DIR))
+        self.max_loaded = max_loaded
+        self.loader = loader
+        self.extender = extender
+        self.cache_dir = cache_dir
+        self._paths = {}
+        self._scanned_mtime = None
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    # rescan only when files were added to or removed from the directories
+    def _scan(self):
+        has_partitions = os.path.isdir(self.partitions_dir)
+        mtime = (os.stat(self.data_dir).st_mtime_ns,
+                 os.stat(self.partitions_dir).st_mtime_ns if has_partitions else None)
+        if mtime != self._scanned_mtime:
+            with os.scandir(self.data_dir) as entries:
+                paths = {symbol_for(entry.path): entry.path for entry in entries
+                         if entry.is_file() and entry.name.endswith('.csv')}
+            if has_partitions:
+                with os.scandir(self.partitions_dir) as entries:
+                    for entry in entries:
+                        if entry.is_dir() and os.path.exists(os.path.join(entry.path, META_FILE)):
+                            paths.setdefault(entry.name, entry.path)
+            self._paths = paths
+            self._scanned_mtime = mtime
+        return self._paths
+
+    def symbols(self):
+        with self._lock:
+            return sorted(self._scan())
+
+    def path(self, symbol):
+        with self._lock:
+            path = self._scan().get(symbol)
+        if path is None:
+            raise KeyError(f'unknown symbol: {symbol}')
+        return path
+
+    def load(self, symbol):
+        path = self.path(symbol)
+        version = _data_version(path)
+        with self._lock:
+            entry = self._frames.get(symbol)
+            if entry is not None:
+                self._frames.move_to_end(symbol)
+                if entry[1] == version:
+                    return entry[0]
+
+        # load outside the lock so a slow first load does not block other sessions
+        df = self._extend(path, *entry) if entry is not None else None
+        if df is None:
+            df = self.loader(path)
+        with self._lock:
+            self._frames[symbol] = (df, version)
+            self._frames.move_to_end(symbol)
+            while len(self._frames) > self.max_loaded:
+                self._frames.popitem(last=False)
+        return df
+
+    # `df` extended by the bars appended since it was loaded at `version`,
+    # or None if the file was changed in any other way
+    def _extend(self, path, df, version):
+        if os.path.isdir(path):
+            return None
+        current = load_ohlcv(path, self.cache_dir)
+        n = len(df)
+        if n == 0 or len(current) <= n or not is_appended_since(path, version, n, self.cache_dir):
+            return None
+        return self.extender(df, current.iloc[n:].reset_index(drop=True))
+
+    # changes whenever the symbol's data does (appended bars, a rewritten
+    # file, rebuilt partitions), for keying results derived from it
+    def version(self, symbol):
+        return _data_version(self.path(symbol))
+
+    def append(self, symbol, new_rows):
+        rows = append_rows(self.path(symbol), new_rows, self.cache_dir)
+        with self._lock:
+            loaded = symbol in self._frames
+        if loaded and not rows.empty:
+            self.load(symbol)
+        return rows
+
+    def loaded(self):
+        with self._lock:
+            return list(self._frames)
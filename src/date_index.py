@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+import numpy as np
+
+# sidebar presets and how far back each one reaches from the last bar
+PRESET_PERIODS = {
+    "1 Month": timedelta(days=30),
+    "3 Months": timedelta(days=90),
+    "6 Months": timedelta(days=180),
+    "1 Year": timedelta(days=365),
+    "5 Years": timedelta(days=1825),
+    "All Time": None,
+}
+
+ONE_DAY = np.timedelta64(1, 'D')
+
+
+def date_values(df):
+    # datetime64[ns] values of a sorted Date column, without copying
+    return df['Date'].to_numpy()
+
+
+def preset_range(dates, preset):
+    end_date = dates[-1].astype('datetime64[D]').item()
+    lookback = PRESET_PERIODS[preset]
+    if lookback is None:
+        return dates[0].astype('datetime64[D]').item(), end_date
+    return end_date - lookback, end_date
+
+
+# positions [lo, hi) of the bars dated start..end inclusive, by binary search
+def date_bounds(dates, start, end):
+    start = np.datetime64(start, 'D')
+    end = np.datetime64(end, 'D') + ONE_DAY
+    lo = int(np.searchsorted(dates, start, side='left'))
+    hi = int(np.searchsorted(dates, end, side='left'))
+    return lo, hi
+
+
+def slice_dates(df, start, end, dates=None):
+    if dates is None:
+        dates = date_values(df)
+    lo, hi = date_bounds(dates, start, end)
+    return df.iloc[lo:hi]
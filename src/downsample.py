@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.view('int64')
+    # offsets from the first point keep nanosecond timestamps precise
+    return (x - x[0]).astype(np.float64)
+
+
+# Largest-Triangle-Three-Buckets: indices of `threshold` points that keep
+# the visual shape of the line
+def lttb_indices(x, y, threshold):
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    xf = _as_float(x)
+    y = np.asarray(y, dtype=np.float64)
+
+    # bucket i spans edges[i]:edges[i + 1]; first and last points are kept
+    edges = np.floor(np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(xf[:n - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    next_x = np.append(avg_x[1:], xf[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((xf[a] - next_x[i]) * (y[lo:hi] - y[a])
+                      - (xf[a] - xf[lo:hi]) * (next_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+# downsample one or more lines sharing an x axis to at most max_points;
+# grouped lines (e.g. Bollinger bands) keep the same x so fills line up
+def downsample_lines(x, ys, max_points):
+    x = np.asarray(x)
+    ys = [np.asarray(y, dtype=np.float64) for y in ys]
+    # leading NaNs of rolling windows carry nothing to draw
+    valid = np.flatnonzero(np.all([np.isfinite(y) for y in ys], axis=0))
+    if len(valid) <= max_points:
+        return x, ys
+    guide = np.mean([y[valid] for y in ys], axis=0)
+    keep = valid[lttb_indices(x[valid], guide, max_points)]
+    return x[keep], [y[keep] for y in ys]
+
+
+def downsample_line(x, y, max_points):
+    x, (y,) = downsample_lines(x, [y], max_points)
+    return x, y
+
+
+# merge the runs of consecutive bars beginning at `starts` into single
+# OHLCV bars, dated by the first or last bar of each run
+def merge_bars(df, starts, date_at='first'):
+    ends = np.append(starts[1:], len(df)) - 1
+    opens = df['Open'].to_numpy()[starts]
+    closes = df['Close'].to_numpy()[ends]
+    return pd.DataFrame({
+        'Date': df['Date'].to_numpy()[starts if date_at == 'first' else ends],
+        'Adj_Close': df['Adj_Close'].to_numpy()[ends],
+        'Close': closes,
+        'High': np.maximum.reduceat(df['High'].to_numpy(), starts),
+        'Low': np.minimum.reduceat(df['Low'].to_numpy(), starts),
+        'Open': opens,
+        'Volume': np.add.reduceat(df['Volume'].to_numpy(), starts),
+        'Up': closes >= opens,
+    })
+
+
+# merge consecutive bars into coarser ones so at most max_bars remain
+def aggregate_ohlcv(df, max_bars):
+    n = len(df)
+    if n <= max_bars:
+        return df, 1
+
+    size = -(-n // max_bars)
+    return merge_bars(df, np.arange(0, n, size)), size
@@ -0,0 +1,534 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from scipy.stats import norm
+
+from analytics import RSI_OVERBOUGHT, RSI_OVERSOLD
+from downsample import aggregate_ohlcv, downsample_line, downsample_lines
+from indicators import VOLATILITY_WINDOW
+from styles import UP_COLOR, DOWN_COLOR
+
+
+# candlestick + volume chart; returns the figure and how many bars each
+# drawn candle covers
+def price_figure(df, show_ma, show_bb, ma_periods, max_points, unit='day'):
+    # Long ranges are drawn with coarser candles and downsampled lines so no
+    # trace ships more than max_points points; narrower ranges fit the
+    # budget and come back at full resolution
+    ohlc_df, bar_size = aggregate_ohlcv(df, max_points)
+
+    # Create subplot with shared x-axis
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True,
+                        vertical_spacing=0.03,
+                        row_heights=[0.7, 0.3])
+
+    # Candlestick chart with enhanced styling
+    fig.add_trace(go.Candlestick(
+        x=ohlc_df['Date'],
+        open=ohlc_df['Open'],
+        high=ohlc_df['High'],
+        low=ohlc_df['Low'],
+        close=ohlc_df['Close'],
+        name='OHLC',
+        increasing_line_color=UP_COLOR,
+        decreasing_line_color=DOWN_COLOR
+    ), row=1, col=1)
+
+    # Add Moving Averages
+    if show_ma:
+        for period in ma_periods:
+            ma_x, ma_y = downsample_line(df['Date'], df[f'MA_{period}'], max_points)
+            fig.add_trace(go.Scatter(
+                x=ma_x,
+                y=ma_y,
+                name=f'{period}-{unit} MA',
+                line=dict(width=1)
+            ), row=1, col=1)
+
+    # Add Bollinger Bands
+    if show_bb:
+        bb_x, (upper_band, lower_band) = downsample_lines(
+            df['Date'], [df['BB_Upper'], df['BB_Lower']], max_points)
+
+        fig.add_trace(go.Scatter(
+            x=bb_x,
+            y=upper_band,
+            name='Upper BB',
+            line=dict(color='rgba(173, 204, 255, 0.7)', width=1),
+            fill=None
+        ), row=1, col=1)
+
+        fig.add_trace(go.Scatter(
+            x=bb_x,
+            y=lower_band,
+            name='Lower BB',
+            line=dict(color='rgba(173, 204, 255, 0.7)', width=1),
+            fill='tonexty',
+            fillcolor='rgba(173, 204, 255, 0.1)'
+        ), row=1, col=1)
+
+    # Volume bars
+    colors = np.where(ohlc_df['Up'], UP_COLOR, DOWN_COLOR)
+
+    fig.add_trace(go.Bar(
+        x=ohlc_df['Date'],
+        y=ohlc_df['Volume'],
+        name='Volume',
+        marker_color=colors,
+        opacity=0.8
+    ), row=2, col=1)
+
+    # Update layout for professional look
+    fig.update_layout(
+        template='plotly_dark',
+        height=800,
+        margin=dict(l=0, r=0, t=0, b=0),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis_rangeslider_visible=False,
+        showlegend=True,
+        legend=dict(
+            bgcolor='rgba(0,0,0,0)',
+            bordercolor='rgba(255,255,255,0.1)',
+            borderwidth=1
+        ),
+        xaxis2_rangeslider_visible=False
+    )
+
+    # Update yaxis labels
+    fig.update_yaxes(title_text="Price (USD)", row=1, col=1)
+    fig.update_yaxes(title_text="Volume", row=2, col=1)
+
+    return fig, bar_size
+
+
+# empty candlestick + volume chart for the live feed; its traces are
+# updated in place by update_live_figure instead of rebuilding the figure
+def live_price_figure():
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True,
+                        vertical_spacing=0.03,
+                        row_heights=[0.7, 0.3])
+    fig.add_trace(go.Candlestick(
+        x=[], open=[], high=[], low=[], close=[],
+        name='OHLC',
+        increasing_line_color=UP_COLOR,
+        decreasing_line_color=DOWN_COLOR
+    ), row=1, col=1)
+    fig.add_trace(go.Bar(x=[], y=[], name='Volume', opacity=0.8), row=2, col=1)
+    fig.update_layout(
+        template='plotly_dark',
+        height=500,
+        margin=dict(l=0, r=0, t=0, b=0),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis_rangeslider_visible=False,
+        showlegend=False,
+        xaxis2_rangeslider_visible=False,
+        # keep zoom and pan across updates
+        uirevision='live'
+    )
+    fig.update_yaxes(title_text="Price (USD)", row=1, col=1)
+    fig.update_yaxes(title_text="Volume", row=2, col=1)
+    return fig
+
+
+def update_live_figure(fig, bars):
+    with fig.batch_update():
+        fig.data[0].update(x=bars['Date'], open=bars['Open'], high=bars['High'],
+                           low=bars['Low'], close=bars['Close'])
+        fig.data[1].update(x=bars['Date'], y=bars['Volume'],
+                           marker_color=np.where(bars['Close'] >= bars['Open'], UP_COLOR, DOWN_COLOR))
+
+
+def returns_figure(df):
+    # Returns Distribution
+    fig_returns = go.Figure()
+
+    fig_returns.add_trace(go.Histogram(
+        x=df['Returns'],
+        nbinsx=50,
+        name='Returns',
+        marker_color='#1E88E5',
+        opacity=0.7
+    ))
+
+    # Add normal distribution curve
+    returns_mean = df['Returns'].mean()
+    returns_std = df['Returns'].std()
+    x = np.linspace(returns_mean - 4*returns_std, returns_mean + 4*returns_std, 100)
+    y = norm.pdf(x, returns_mean, returns_std)
+
+    fig_returns.add_trace(go.Scatter(
+        x=x,
+        y=y * len(df['Returns']) * (df['Returns'].max() - df['Returns'].min()) / 50,
+        mode='lines',
+        name='Normal Distribution',
+        line=dict(color='#00ff88', width=2)
+    ))
+
+    fig_returns.update_layout(
+        title='Returns Distribution',
+        template='plotly_dark',
+        height=400,
+        showlegend=True,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig_returns
+
+
+def volatility_figure(df, max_points, unit='day'):
+    # Volatility Analysis
+    fig_vol = go.Figure()
+
+    vol_x, vol_y = downsample_line(df['Date'], df['Volatility'], max_points)
+    fig_vol.add_trace(go.Scatter(
+        x=vol_x,
+        y=vol_y,
+        name='Rolling Volatility',
+        line=dict(color='#1E88E5', width=2)
+    ))
+
+    fig_vol.update_layout(
+        title=f'{VOLATILITY_WINDOW}-{unit.title()} Rolling Volatility',
+        template='plotly_dark',
+        height=400,
+        showlegend=True,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        yaxis_title='Annualized Volatility (%)'
+    )
+    return fig_vol
+
+
+# rolling Sharpe, drawdown and tail risk over a trailing window, sharing
+# the date axis of the volatility chart
+def rolling_risk_figure(dates, metrics, window, max_points, unit='day'):
+    fig = make_subplots(rows=3, cols=1, shared_xaxes=True,
+                        vertical_spacing=0.05,
+                        subplot_titles=(f'{window}-{unit.title()} Rolling Sharpe Ratio',
+                                        'Drawdown and Tail Risk (%)',
+                                        'Downside Deviation (%)'))
+
+    x, (sharpe, drawdown, var, cvar, downside) = downsample_lines(
+        dates, [metrics['Sharpe'], metrics['Max_Drawdown'], metrics['VaR'], metrics['CVaR'],
+                metrics['Downside_Deviation']], max_points)
+
+    fig.add_trace(go.Scatter(x=x, y=sharpe, name='Sharpe',
+                             line=dict(color='#1E88E5', width=2)), row=1, col=1)
+    fig.add_trace(go.Scatter(x=x, y=drawdown * 100, name=f'Max drawdown within {window} {unit}s',
+                             line=dict(color=DOWN_COLOR, width=1), fill='tozeroy'), row=2, col=1)
+    # losses drawn below zero alongside the drawdown
+    fig.add_trace(go.Scatter(x=x, y=-var * 100, name='VaR',
+                             line=dict(color='#ffaa00', width=1)), row=2, col=1)
+    fig.add_trace(go.Scatter(x=x, y=-cvar * 100, name='CVaR',
+                             line=dict(color='#ff66cc', width=1)), row=2, col=1)
+    fig.add_trace(go.Scatter(x=x, y=downside * 100, name='Downside Deviation',
+                             line=dict(color=UP_COLOR, width=1)), row=3, col=1)
+
+    fig.add_hline(y=0, line_dash="dash", line_color="white", opacity=0.3, row=1, col=1)
+    fig.update_layout(
+        template='plotly_dark',
+        height=700,
+        showlegend=True,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
+
+
+def rsi_figure(df, max_points):
+    # RSI Chart
+    fig_rsi = go.Figure()
+
+    rsi_x, rsi_y = downsample_line(df['Date'], df['RSI'], max_points)
+    fig_rsi.add_trace(go.Scatter(
+        x=rsi_x,
+        y=rsi_y,
+        name='RSI',
+        line=dict(color='#1E88E5', width=2)
+    ))
+
+    fig_rsi.add_hline(y=RSI_OVERBOUGHT, line_dash="dash", line_color="red", opacity=0.5)
+    fig_rsi.add_hline(y=RSI_OVERSOLD, line_dash="dash", line_color="green", opacity=0.5)
+
+    fig_rsi.update_layout(
+        title='Relative Strength Index (RSI)',
+        template='plotly_dark',
+        height=300,
+        showlegend=True,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        yaxis_title='RSI'
+    )
+    return fig_rsi
+
+
+# strategy equity against buy-and-hold, with the strategy's drawdown below
+def backtest_figure(dates, equity, buy_hold, drawdown, max_points):
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True,
+                        vertical_spacing=0.03,
+                        row_heights=[0.7, 0.3])
+
+    x, (equity, buy_hold, drawdown) = downsample_lines(dates, [equity, buy_hold, drawdown], max_points)
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=equity,
+        name='Strategy',
+        line=dict(color='#1E88E5', width=2)
+    ), row=1, col=1)
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=buy_hold,
+        name='Buy & Hold',
+        line=dict(color='rgba(255, 255, 255, 0.5)', width=1)
+    ), row=1, col=1)
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=drawdown * 100,
+        name='Drawdown',
+        line=dict(color=DOWN_COLOR, width=1),
+        fill='tozeroy'
+    ), row=2, col=1)
+
+    fig.update_layout(
+        template='plotly_dark',
+        height=500,
+        margin=dict(l=0, r=0, t=0, b=0),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        showlegend=True,
+        legend=dict(
+            bgcolor='rgba(0,0,0,0)',
+            bordercolor='rgba(255,255,255,0.1)',
+            borderwidth=1
+        )
+    )
+    fig.update_yaxes(title_text="Growth of $1", row=1, col=1)
+    fig.update_yaxes(title_text="Drawdown (%)", row=2, col=1)
+    return fig
+
+
+# parameter grid (rows x columns DataFrame) of Sharpe ratios
+def sweep_heatmap(grid):
+    fig = go.Figure(go.Heatmap(
+        z=grid.to_numpy(),
+        x=grid.columns,
+        y=grid.index,
+        colorscale='RdYlGn',
+        zmid=0,
+        colorbar=dict(title='Sharpe'),
+        hovertemplate=f'{grid.index.name} %{{y}}<br>{grid.columns.name} %{{x}}<br>Sharpe %{{z:.2f}}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        template='plotly_dark',
+        height=500,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis_title=grid.columns.name,
+        yaxis_title=grid.index.name
+    )
+    return fig
+
+
+# colors of the ticker and up to eight peers, in universe order
+PEER_COLORS = ['#1E88E5', UP_COLOR, '#ffaa00', '#ff66cc', '#b388ff', '#4dd0e1', '#ff8a65', '#aed581', '#f06292']
+
+
+# closes of every series rebased to 100 at the start of the range
+def relative_performance_figure(dates, rebased, symbols, max_points):
+    x, lines = downsample_lines(dates, list(rebased.T), max_points)
+    fig = go.Figure()
+    for i, (symbol, y) in enumerate(zip(symbols, lines)):
+        fig.add_trace(go.Scatter(
+            x=x,
+            y=y,
+            name=symbol,
+            line=dict(color=PEER_COLORS[i % len(PEER_COLORS)], width=2 if i == 0 else 1)
+        ))
+
+    fig.add_hline(y=100, line_dash="dash", line_color="white", opacity=0.3)
+    fig.update_layout(
+        title='Relative Performance (rebased to 100)',
+        template='plotly_dark',
+        height=400,
+        showlegend=True,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        yaxis_title='Rebased Close'
+    )
+    return fig
+
+
+# rolling correlation and beta of the first symbol against each of the others
+def comovement_figure(dates, correlation, beta, symbols, window, max_points, unit='day'):
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True,
+                        vertical_spacing=0.08,
+                        subplot_titles=(f'{window}-{unit.title()} Rolling Correlation with {symbols[0]}',
+                                        f'{window}-{unit.title()} Rolling Beta of {symbols[0]}'))
+
+    peers = len(symbols) - 1
+    x, lines = downsample_lines(dates, list(correlation[:, 0, 1:].T) + list(beta[:, 0, 1:].T), max_points)
+    for i, symbol in enumerate(symbols[1:]):
+        color = PEER_COLORS[(i + 1) % len(PEER_COLORS)]
+        fig.add_trace(go.Scatter(x=x, y=lines[i], name=symbol, legendgroup=symbol,
+                                 line=dict(color=color, width=1)), row=1, col=1)
+        fig.add_trace(go.Scatter(x=x, y=lines[peers + i], name=symbol, legendgroup=symbol, showlegend=False,
+                                 line=dict(color=color, width=1)), row=2, col=1)
+
+    fig.add_hline(y=0, line_dash="dash", line_color="white", opacity=0.3, row=1, col=1)
+    fig.add_hline(y=1, line_dash="dash", line_color="white", opacity=0.3, row=2, col=1)
+    fig.update_layout(
+        template='plotly_dark',
+        height=600,
+        showlegend=True,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    fig.update_yaxes(range=[-1, 1], row=1, col=1)
+    return fig
+
+
+# correlation matrix of one window
+def correlation_heatmap(matrix, symbols, title):
+    fig = go.Figure(go.Heatmap(
+        z=matrix,
+        x=symbols,
+        y=symbols,
+        colorscale='RdBu',
+        zmin=-1,
+        zmax=1,
+        colorbar=dict(title='Correlation'),
+        text=np.round(matrix, 2),
+        texttemplate='%{text}',
+        hovertemplate='%{y} / %{x}<br>Correlation %{z:.2f}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        title=title,
+        template='plotly_dark',
+        height=400,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        yaxis=dict(autorange='reversed')
+    )
+    return fig
+
+
+# Monte Carlo fan chart: recent closes followed by the simulated price
+# quantile bands, with the x axis counted in bars from the last close
+def fan_chart(recent_close, fan, unit='day'):
+    history_x = np.arange(-len(recent_close) + 1, 1)
+    future_x = np.arange(len(next(iter(fan.values()))))
+    quantiles = sorted(fan)
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=history_x,
+        y=recent_close,
+        name='Close',
+        line=dict(color='white', width=1)
+    ))
+
+    # nested bands from the outer quantiles inwards
+    for lower, upper in zip(quantiles[:len(quantiles) // 2], quantiles[::-1]):
+        fig.add_trace(go.Scatter(
+            x=future_x,
+            y=fan[upper],
+            line=dict(width=0),
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+        fig.add_trace(go.Scatter(
+            x=future_x,
+            y=fan[lower],
+            name=f'{lower:.0%}–{upper:.0%}',
+            line=dict(width=0),
+            fill='tonexty',
+            fillcolor='rgba(30, 136, 229, 0.25)'
+        ))
+
+    if len(quantiles) % 2:
+        median = quantiles[len(quantiles) // 2]
+        fig.add_trace(go.Scatter(
+            x=future_x,
+            y=fan[median],
+            name='Median',
+            line=dict(color='#1E88E5', width=2)
+        ))
+
+    fig.update_layout(
+        template='plotly_dark',
+        height=450,
+        showlegend=True,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis_title=f'{unit.title()}s from last close',
+        yaxis_title='Price (USD)'
+    )
+    return fig
+
+
+# statistics tables, formatted from the dicts of analytics or RangeStats
+# a table value, or a dash when the range is too short to define it
+def _stat(value, spec, prefix='', suffix=''):
+    return '–' if np.isnan(value) else f"{prefix}{value:{spec}}{suffix}"
+
+
+def price_stats_table(stats):
+    return pd.DataFrame({
+        'Metric': [
+            'Highest Price',
+            'Lowest Price',
+            'Average Price',
+            'Price Range',
+            'Current vs Avg'
+        ],
+        'Value': [
+            _stat(stats['high'], '.2f', prefix='$'),
+            _stat(stats['low'], '.2f', prefix='$'),
+            _stat(stats['average'], '.2f', prefix='$'),
+            _stat(stats['range'], '.2f', prefix='$'),
+            _stat(stats['current_vs_avg_pct'], '.1f', suffix='%')
+        ]
+    })
+
+
+def return_stats_table(stats, period_label='Daily'):
+    return pd.DataFrame({
+        'Metric': [
+            f'{period_label} Returns Mean',
+            f'{period_label} Returns Std',
+            'Annualized Return',
+            'Sharpe Ratio',
+            'Positive Days %'
+        ],
+        'Value': [
+            _stat(stats['mean'] * 100, '.2f', suffix='%'),
+            _stat(stats['std'] * 100, '.2f', suffix='%'),
+            _stat(stats['annualized_return_pct'], '.2f', suffix='%'),
+            _stat(stats['sharpe'], '.2f'),
+            _stat(stats['positive_days_pct'], '.1f', suffix='%')
+        ]
+    })
+
+
+def volume_stats_table(stats, period_label='Daily'):
+    return pd.DataFrame({
+        'Metric': [
+            'Highest Volume',
+            'Lowest Volume',
+            f'Avg {period_label} Volume',
+            'Volume Trend',
+            'Volume Volatility'
+        ],
+        'Value': [
+            _stat(stats['high'], ',.0f'),
+            _stat(stats['low'], ',.0f'),
+            _stat(stats['average'], ',.0f'),
+            _stat(stats['trend_pct'], '.1f', suffix='%'),
+            _stat(stats['volatility_pct'], '.1f', suffix='%')
+        ]
+    })
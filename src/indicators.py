@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+# every moving average period offered in the sidebar
+MA_PERIODS = (20, 50, 100, 200)
+BB_WINDOW = 20
+BB_STD = 2
+RSI_PERIODS = 14
+VOLATILITY_WINDOW = 20
+TRADING_DAYS = 252
+
+# bars of history that determine every indicator of the next bar
+INDICATOR_WARMUP = max(max(MA_PERIODS), BB_WINDOW, RSI_PERIODS + 1, VOLATILITY_WINDOW + 1)
+
+
+def calculate_rsi(data, periods=RSI_PERIODS):
+    close_delta = data['Close'].diff()
+    gain = (close_delta.where(close_delta > 0, 0)).rolling(window=periods).mean()
+    loss = (-close_delta.where(close_delta < 0, 0)).rolling(window=periods).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+# computed once over the full history, so any date window is a plain slice
+# and indicators at the start of a window are warmed up by earlier bars;
+# periods_per_year annualizes the volatility of non-daily bars
+def compute_indicators(df, periods_per_year=TRADING_DAYS):
+    close = df['Close']
+    indicators = {}
+
+    for period in MA_PERIODS:
+        indicators[f'MA_{period}'] = close.rolling(window=period).mean()
+
+    bb_mid = close.rolling(window=BB_WINDOW).mean()
+    bb_std = close.rolling(window=BB_WINDOW).std()
+    indicators['BB_Upper'] = bb_mid + (bb_std * BB_STD)
+    indicators['BB_Lower'] = bb_mid - (bb_std * BB_STD)
+
+    indicators['RSI'] = calculate_rsi(df)
+
+    # up/down bar classification shared by the candlestick and volume colors
+    indicators['Up'] = df['Close'].to_numpy() >= df['Open'].to_numpy()
+
+    returns = close.pct_change()
+    indicators['Returns'] = returns
+    indicators['Volatility'] = returns.rolling(window=VOLATILITY_WINDOW).std() * np.sqrt(periods_per_year) * 100
+
+    return pd.DataFrame(indicators, index=df.index)
+
+
+def add_indicators(df, periods_per_year=TRADING_DAYS):
+    return pd.concat([df, compute_indicators(df, periods_per_year)], axis=1)
+
+
+# indicators of appended bars depend only on the trailing INDICATOR_WARMUP
+# bars, so those are the only state needed to extend them without
+# recomputing the full history
+def extend_indicators(df, new_rows):
+    tail = df[list(new_rows.columns)].iloc[-INDICATOR_WARMUP:]
+    window = pd.concat([tail, new_rows], ignore_index=True)
+    extended = add_indicators(window).iloc[len(tail):]
+    extended.index = pd.RangeIndex(len(df), len(df) + len(new_rows))
+    return pd.concat([df, extended])
@@ -0,0 +1,24 @@
+import argparse
+
+import pandas as pd
+
+from data_loader import DATA_PATH, append_rows
+
+
+# Append new daily bars to an OHLCV csv and its columnar cache, e.g.
+#   python src/ingest.py new_bars.csv --data data/BMW_Data.csv
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Append new bars after the last Date of an OHLCV csv.')
+    parser.add_argument('new_rows', help='csv with the Date,Adj_Close,Close,High,Low,Open,Volume columns')
+    parser.add_argument('--data', default=DATA_PATH, help=f'data file to append to (default: {DATA_PATH})')
+    args = parser.parse_args(argv)
+
+    try:
+        rows = append_rows(args.data, pd.read_csv(args.new_rows))
+    except ValueError as e:
+        parser.exit(1, f'error: {e}\n')
+    print(f'Appended {len(rows)} rows to {args.data}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_loader import COLUMN_DTYPES, PARTITIONS_DIR, read_meta, read_sidecar, write_meta
+from date_index import date_bounds
+from downsample import merge_bars
+
+# Out-of-core storage for intraday bars (tens of millions of rows). A csv is
+# read in chunks and split into one directory per calendar month; each
+# month holds its raw bars plus pre-aggregated levels, every level stored
+# as the same memory-mappable .npy columns as the csv sidecars:
+#
+#   data/partitions/<SYMBOL>/meta.json
+#   data/partitions/<SYMBOL>/2024-01/raw/Close.npy
+#   data/partitions/<SYMBOL>/2024-01/15min/Close.npy
+#   ...
+#
+# A date-range query maps only the months it touches, at the finest level
+# whose bar count fits the caller's budget, so memory and latency follow
+# the size of the answer rather than of the dataset.
+
+PARTITION_VERSION = 1
+RAW_LEVEL = 'raw'
+# pre-aggregated levels, finest first; the daily level also feeds the
+# dashboard's full-history analytics
+LEVELS = ('5min', '15min', '1h', '1D')
+DAILY_LEVEL = '1D'
+LEVEL_LABELS = {RAW_LEVEL: 'source', '5min': '5-minute', '15min': '15-minute', '1h': 'hourly', '1D': 'daily'}
+
+# csv rows parsed at a time while partitioning
+CHUNK_ROWS = 1_000_000
+
+
+# bars of each calendar bucket of `rule` merged into one, dated by the
+# bucket start (midnight for daily bars, as in the daily csv files)
+def aggregate_level(df, rule):
+    buckets = pd.DatetimeIndex(df['Date']).floor(rule).asi8
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    bars = merge_bars(df, starts).drop(columns='Up')
+    bars['Date'] = buckets[starts].view('datetime64[ns]')
+    return bars
+
+
+def _write_columns(directory, df):
+    os.makedirs(directory, exist_ok=True)
+    for col, dtype in COLUMN_DTYPES.items():
+        np.save(os.path.join(directory, f'{col}.npy'), df[col].to_numpy(dtype=dtype))
+
+
+def _write_partition(out_dir, df):
+    name = str(df['Date'].iloc[0].to_period('M'))
+    rows = {RAW_LEVEL: len(df)}
+    _write_columns(os.path.join(out_dir, name, RAW_LEVEL), df)
+    for level in LEVELS:
+        bars = aggregate_level(df, level)
+        _write_columns(os.path.join(out_dir, name, level), bars)
+        rows[level] = len(bars)
+    return {'name': name, 'first': str(df['Date'].iloc[0]), 'last': str(df['Date'].iloc[-1]), 'rows': rows}
+
+
+# Partition a date-sorted OHLCV csv of any size into out_dir. Only one
+# chunk plus the month in progress is held in memory; each month is written
+# as soon as a later one starts, and the meta is written last so an
+# interrupted build is never read as complete.
+def build_partitions(csv_path, out_dir, chunk_rows=CHUNK_ROWS):
+    numeric = {col: dtype for col, dtype in COLUMN_DTYPES.items() if col != 'Date'}
+    partitions = []
+    pending = None
+    last_date = None
+    for chunk in pd.read_csv(csv_path, dtype=numeric, parse_dates=['Date'], chunksize=chunk_rows):
+        chunk = chunk[list(COLUMN_DTYPES)]
+        dates = chunk['Date'].to_numpy()
+        if (last_date is not None and dates[0] <= last_date) or (np.diff(dates) <= np.timedelta64(0)).any():
+            raise ValueError(f'{csv_path} must be in strictly increasing date order')
+        last_date = dates[-1]
+
+        if pending is not None:
+            chunk = pd.concat([pending, chunk], ignore_index=True)
+        months = chunk['Date'].to_numpy().astype('datetime64[M]')
+        complete = months < months[-1]
+        starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+        ends = np.append(starts[1:], len(chunk))
+        for start, end in zip(starts, ends):
+            if complete[start]:
+                partitions.append(_write_partition(out_dir, chunk.iloc[start:end]))
+        pending = chunk[~complete].reset_index(drop=True)
+
+    if pending is not None and len(pending):
+        partitions.append(_write_partition(out_dir, pending))
+
+    os.makedirs(out_dir, exist_ok=True)
+    write_meta(out_dir, {
+        'version': PARTITION_VERSION,
+        'source': os.path.abspath(csv_path),
+        'levels': [RAW_LEVEL, *LEVELS],
+        'partitions': partitions,
+    })
+    return partitions
+
+
+def is_partitioned(path):
+    return os.path.isdir(path)
+
+
+class PartitionedStore:
+    def __init__(self, directory):
+        meta = read_meta(directory)
+        if meta is None or meta.get('version') != PARTITION_VERSION:
+            raise FileNotFoundError(f'no partitioned data in {directory}')
+        self.directory = directory
+        self.partitions = meta['partitions']
+        self.levels = meta['levels']
+        self._firsts = np.array([p['first'] for p in self.partitions], dtype='datetime64[ns]')
+        self._lasts = np.array([p['last'] for p in self.partitions], dtype='datetime64[ns]')
+
+    def partition_frame(self, index, level=RAW_LEVEL):
+        return read_sidecar(os.path.join(self.directory, self.partitions[index]['name'], level))
+
+    # one level across partitions lo..hi-1, memory-mapped
+    def level_frame(self, level=DAILY_LEVEL, lo=0, hi=None):
+        hi = len(self.partitions) if hi is None else hi
+        frames = [self.partition_frame(i, level) for i in range(lo, hi)]
+        if not frames:
+            return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in COLUMN_DTYPES.items()})
+        return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+    # partitions lo..hi-1 holding bars dated start..end inclusive
+    def touched(self, start, end):
+        lo, _ = date_bounds(self._lasts, start, start)
+        _, hi = date_bounds(self._firsts, end, end)
+        return lo, max(lo, hi)
+
+    # bars of `level` dated start..end in partitions lo..hi-1: the months in
+    # between from the meta, the first and last by binary search on their
+    # memory-mapped Date column
+    def count(self, level, start, end, lo, hi):
+        if hi <= lo:
+            return 0
+        total = sum(p['rows'][level] for p in self.partitions[lo + 1:hi - 1])
+        for i in sorted({lo, hi - 1}):
+            dates = np.load(os.path.join(self.directory, self.partitions[i]['name'], level, 'Date.npy'),
+                            mmap_mode='r')
+            first, last = date_bounds(dates, start, end)
+            total += last - first
+        return total
+
+    # Bars dated start..end at the finest level with at most max_bars bars
+    # in that range (the daily level when none fits), preceded by up to
+    # `warmup` earlier bars from the previous months so indicators are warm
+    # at the window start. Returns the bars, the level and how many warm-up
+    # bars lead them.
+    def query(self, start, end, max_bars, warmup=0):
+        lo, hi = self.touched(start, end)
+        level = DAILY_LEVEL
+        for candidate in self.levels:
+            if self.count(candidate, start, end, lo, hi) <= max_bars:
+                level = candidate
+                break
+
+        first = lo
+        while first > 0 and sum(p['rows'][level] for p in self.partitions[first:lo]) < warmup:
+            first -= 1
+        bars = self.level_frame(level, first, hi)
+        begin, stop = date_bounds(bars['Date'].to_numpy(), start, end)
+        lead = min(warmup, begin)
+        return bars.iloc[begin - lead:stop].reset_index(drop=True), level, lead
+
+
+# Partition an intraday csv into data/partitions/<SYMBOL>, e.g.
+#   python src/partitions.py bmw_1min.csv --symbol BMW_1MIN
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Split a large OHLCV csv into monthly partitions '
+                                                 'with pre-aggregated levels.')
+    parser.add_argument('csv', help='csv with the Date,Adj_Close,Close,High,Low,Open,Volume columns')
+    parser.add_argument('--symbol', required=True, help='ticker the partitions are listed under')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help='csv rows parsed at a time')
+    args = parser.parse_args(argv)
+
+    out_dir = os.path.join(PARTITIONS_DIR, args.symbol)
+    try:
+        partitions = build_partitions(args.csv, out_dir, args.chunk_rows)
+    except ValueError as e:
+        parser.exit(1, f'error: {e}\n')
+    rows = sum(p['rows'][RAW_LEVEL] for p in partitions)
+    print(f'Wrote {rows:,} bars in {len(partitions)} monthly partitions to {out_dir}')
+
+
+if __name__ == '__main__':
+    main()
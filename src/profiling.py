@@ -0,0 +1,68 @@
+import json
+import logging
+import time
+
+import pandas as pd
+import plotly.io as pio
+
+logger = logging.getLogger('bmw_dashboard.profile')
+
+
+def _configure_logger():
+    # one JSON object per line on stderr, unless the host app set up handlers
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+
+# Times consecutive sections of a script run: each lap(name) closes the
+# section that started at the previous lap. Chart payload sizes are measured
+# by serializing the figure the way st.plotly_chart does, so that cost is
+# only paid while profiling is enabled.
+class RerunProfiler:
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.sections = []
+        self.charts = []
+        self._started = self._last = time.perf_counter()
+
+    def lap(self, name):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.sections.append((name, (now - self._last) * 1000))
+        self._last = now
+
+    def chart(self, name, fig):
+        if not self.enabled:
+            return
+        start = time.perf_counter()
+        payload = pio.to_json(fig, validate=False)
+        self.charts.append((name, len(payload.encode()), (time.perf_counter() - start) * 1000))
+        # keep the measurement itself out of the section timings
+        self._last += time.perf_counter() - start
+
+    def section_table(self):
+        return pd.DataFrame(self.sections, columns=['Section', 'ms'])
+
+    def chart_table(self):
+        return pd.DataFrame([(name, size / 1024, ms) for name, size, ms in self.charts],
+                            columns=['Chart', 'KB', 'Serialize ms'])
+
+    def total_ms(self):
+        return (time.perf_counter() - self._started) * 1000
+
+    def log(self, **context):
+        if not self.enabled:
+            return
+        _configure_logger()
+        logger.info(json.dumps({
+            'event': 'rerun_profile',
+            **context,
+            'total_ms': round(self.total_ms(), 3),
+            'sections': {name: round(ms, 3) for name, ms in self.sections},
+            'charts': {name: {'bytes': size, 'serialize_ms': round(ms, 3)} for name, size, ms in self.charts},
+        }, default=str))
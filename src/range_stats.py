@@ -0,0 +1,139 @@
+import numpy as np
+
+from arrays import as_float_array
+from indicators import TRADING_DAYS
+
+# Summary statistics of any bar range [lo, hi) in constant time, from
+# arrays built once per frame: prefix sums (and sums of squares) for means
+# and standard deviations, and sparse tables for maxima and minima. The
+# results match the analytics functions run over the same slice; empty
+# ranges, and spreads of a single value, come back as NaN.
+
+# a range variance below this fraction of the running sum of squares it is
+# taken from is rounding noise of the subtraction, not a spread
+VARIANCE_EPSILON = 1e-12
+
+
+# range max or min in O(1): level k holds the extreme of every run of 2**k
+# bars, and any range is covered by two overlapping runs
+class SparseTable:
+    def __init__(self, values, op):
+        self.op = op
+        self.levels = [as_float_array(values)]
+        width = 1
+        while 2 * width <= len(self.levels[0]):
+            previous = self.levels[-1]
+            self.levels.append(op(previous[:-width], previous[width:]))
+            width *= 2
+
+    def query(self, lo, hi):
+        if hi <= lo:
+            return np.nan
+        k = int(hi - lo).bit_length() - 1
+        level = self.levels[k]
+        return self.op(level[lo], level[hi - (1 << k)])
+
+
+# running sums with a leading zero, so sum(x[lo:hi]) = p[hi] - p[lo], of
+# values centered first like those given to arrays.window_sums
+class PrefixSums:
+    def __init__(self, values):
+        values = as_float_array(values)
+        self.valid = np.isfinite(values)
+        self.center = np.mean(values[self.valid]) if self.valid.any() else 0.0
+        centered = np.where(self.valid, values - self.center, 0.0)
+        self.count = np.concatenate(([0], np.cumsum(self.valid)))
+        self.sums = np.concatenate(([0.0], np.cumsum(centered)))
+        self.squares = np.concatenate(([0.0], np.cumsum(centered ** 2)))
+
+    def mean(self, lo, hi):
+        n = self.count[hi] - self.count[lo]
+        return (self.sums[hi] - self.sums[lo]) / n + self.center if n else np.nan
+
+    def std(self, lo, hi, ddof=1):
+        n = self.count[hi] - self.count[lo]
+        if n <= max(ddof, 1):
+            return np.nan
+        sums = self.sums[hi] - self.sums[lo]
+        squares = self.squares[hi] - self.squares[lo]
+        spread = max(squares - sums * sums / n, 0.0)
+        if spread <= VARIANCE_EPSILON * self.squares[hi]:
+            return np.nan
+        return np.sqrt(spread / (n - ddof))
+
+
+class RangeStats:
+    # df has the High, Low, Close, Volume and Returns columns of a sorted
+    # frame; Returns are the full-history close-to-close returns
+    def __init__(self, df):
+        self.close = as_float_array(df['Close'])
+        self.high = SparseTable(df['High'], np.maximum)
+        self.low = SparseTable(df['Low'], np.minimum)
+        self.close_sums = PrefixSums(self.close)
+
+        volume = as_float_array(df['Volume'])
+        self.volume_max = SparseTable(volume, np.maximum)
+        self.volume_min = SparseTable(volume, np.minimum)
+        self.volume_sums = PrefixSums(volume)
+
+        returns = as_float_array(df['Returns'])
+        self.return_sums = PrefixSums(returns)
+        self.positive = np.concatenate(([0], np.cumsum(returns > 0)))
+
+    def __len__(self):
+        return len(self.close)
+
+    def price_change_pct(self, lo, hi):
+        if hi <= lo:
+            return np.nan
+        return (self.close[hi - 1] - self.close[lo]) / self.close[lo] * 100
+
+    def average_volume(self, lo, hi):
+        return self.volume_sums.mean(lo, hi)
+
+    # volatility of the returns inside the range, whose first bar has no
+    # return of its own, as annualized_volatility computes for a slice
+    def annualized_volatility(self, lo, hi, periods_per_year=TRADING_DAYS):
+        return self.return_sums.std(lo + 1, hi) * np.sqrt(periods_per_year) * 100
+
+    def price_stats(self, lo, hi):
+        high = self.high.query(lo, hi)
+        low = self.low.query(lo, hi)
+        average = self.close_sums.mean(lo, hi)
+        return {
+            'high': high,
+            'low': low,
+            'average': average,
+            'range': high - low,
+            'current_vs_avg_pct': (self.close[hi - 1] / average - 1) * 100 if hi > lo else np.nan,
+        }
+
+    # statistics of the returns inside the range, which like the volatility
+    # start at its second bar: Returns[lo] leads into the range from before it
+    def return_stats(self, lo, hi, periods_per_year=TRADING_DAYS):
+        sums = self.return_sums
+        first = min(lo + 1, hi)
+        mean = sums.mean(first, hi)
+        n = sums.count[hi] - sums.count[first]
+        # NaN, not a division by noise, when the returns have no spread
+        sharpe = mean / sums.std(first, hi, ddof=0) * np.sqrt(periods_per_year)
+        return {
+            'mean': mean,
+            'std': sums.std(first, hi),
+            'annualized_return_pct': mean * periods_per_year * 100,
+            'sharpe': sharpe,
+            'positive_days_pct': (self.positive[hi] - self.positive[first]) / n * 100 if n else np.nan,
+        }
+
+    def volume_stats(self, lo, hi):
+        sums = self.volume_sums
+        average = sums.mean(lo, hi)
+        # last five bars against the first five
+        edge = min(5, hi - lo)
+        return {
+            'high': self.volume_max.query(lo, hi),
+            'low': self.volume_min.query(lo, hi),
+            'average': average,
+            'trend_pct': (sums.mean(hi - edge, hi) / sums.mean(lo, lo + edge) - 1) * 100,
+            'volatility_pct': sums.std(lo, hi) / average * 100,
+        }
@@ -0,0 +1,23 @@
+import numpy as np
+
+from downsample import merge_bars
+
+# bar timeframes offered in the sidebar: the pandas period a bar spans, how
+# many bars make a year (for annualizing) and the unit used in labels
+TIMEFRAMES = {
+    "Daily": {"rule": None, "periods_per_year": 252, "unit": "day"},
+    "Weekly": {"rule": "W-FRI", "periods_per_year": 52, "unit": "week"},
+    "Monthly": {"rule": "M", "periods_per_year": 12, "unit": "month"},
+    "Quarterly": {"rule": "Q", "periods_per_year": 4, "unit": "quarter"},
+}
+
+
+# aggregate sorted daily bars into one bar per calendar period (open=first,
+# high=max, low=min, close=last, volume=sum). Each bar is dated by the last
+# trading day it covers, so date slicing and "current" values keep working.
+def resample_ohlcv(df, rule):
+    if rule is None or df.empty:
+        return df
+    ordinals = df['Date'].dt.to_period(rule).array.asi8
+    starts = np.flatnonzero(np.r_[True, ordinals[1:] != ordinals[:-1]])
+    return merge_bars(df, starts, date_at='last').drop(columns='Up')
@@ -0,0 +1,163 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+# Process-wide cache of derived results (figures, tables, backtests, ...)
+# shared by every session. Entries are keyed by a digest of the caller's
+# key, which includes the dataset version, so new data never serves stale
+# results. Memory is bounded in bytes (pickled size) with least recently
+# used eviction; with a directory configured, entries are also written to
+# disk under their own byte budget, so they survive restarts and are
+# shared by every server process using that directory. Concurrent requests
+# for a key that is being computed wait for that computation instead of
+# repeating it.
+
+# Part of every key, with the caller's code version: bump it when the
+# layout of cached entries changes so older pickles on disk are never read
+CACHE_VERSION = 1
+
+
+def key_digest(key):
+    return hashlib.sha256(repr(key).encode()).hexdigest()
+
+
+# digest of the .py files in `directory`, so a deploy with changed code
+# starts from an empty disk tier instead of unpickling results (or classes)
+# of the previous build
+def code_version(directory):
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.py'):
+            with open(os.path.join(directory, name), 'rb') as f:
+                digest.update(name.encode() + b'\0' + f.read())
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    def __init__(self, max_bytes, directory=None, max_disk_bytes=0, version=''):
+        self.max_bytes = max_bytes
+        self.version = version
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.hits = self.disk_hits = self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def get_or_compute(self, key, compute):
+        digest = key_digest((CACHE_VERSION, self.version, key))
+        while True:
+            with self._lock:
+                entry = self._entries.get(digest)
+                if entry is not None:
+                    self._entries.move_to_end(digest)
+                    self.hits += 1
+                    return entry[0]
+                pending = self._pending.get(digest)
+                if pending is None:
+                    pending = self._pending[digest] = threading.Event()
+                    break
+            # another session is computing this key
+            pending.wait()
+
+        try:
+            value = self._read_disk(digest)
+            if value is None:
+                value = compute()
+                payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                self._write_disk(digest, payload)
+                size = len(payload)
+                with self._lock:
+                    self.misses += 1
+            else:
+                value, size = value
+            self._store(digest, value, size)
+            return value
+        finally:
+            with self._lock:
+                del self._pending[digest]
+            pending.set()
+
+    def _store(self, digest, value, size):
+        with self._lock:
+            if size > self.max_bytes:
+                return
+            self._entries[digest] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def _path(self, digest):
+        return os.path.join(self.directory, f'{digest}.pkl')
+
+    def _read_disk(self, digest):
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(digest), 'rb') as f:
+                payload = f.read()
+        except OSError:
+            return None
+        try:
+            value = pickle.loads(payload)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError, TypeError,
+                ValueError):
+            # truncated, or written by code that has since changed (a moved
+            # module or renamed class): a miss, and the file is dropped
+            try:
+                os.remove(self._path(digest))
+            except OSError:
+                pass
+            return None
+        # reading marks the file as recently used for disk eviction
+        try:
+            os.utime(self._path(digest))
+        except OSError:
+            pass
+        with self._lock:
+            self.disk_hits += 1
+        return value, len(payload)
+
+    def _write_disk(self, digest, payload):
+        if not self.directory or len(payload) > self.max_disk_bytes:
+            return
+        tmp_path = self._path(digest) + f'.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._path(digest))
+            self._evict_disk()
+        except OSError:
+            # a full or read-only disk only costs the disk tier
+            pass
+
+    # drop the least recently used files until the directory fits its budget
+    def _evict_disk(self):
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith('.pkl'):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+from analytics import daily_returns
+from arrays import as_float_array, nan_padded, window_sums
+from indicators import TRADING_DAYS
+
+# Rolling risk metrics over a trailing window of bars, computed for the
+# whole history in a few vectorized passes instead of rolling().apply:
+# means and deviations from running sums, maximum drawdowns with the van
+# Herk/Gil-Werman block trick (O(n) for any window), and tail quantiles
+# with np.partition over bounded chunks of windows. Every result is NaN
+# until a full window of returns exists.
+
+RISK_WINDOWS = (21, 63, 126, 252)
+VAR_LEVEL = 0.95
+
+# windows partitioned at once for VaR/CVaR, bounding memory to about
+# chunk x window values
+VAR_CHUNK_WINDOWS = 4096
+
+
+# x split into rows of `window` bars, the last one padded with the last
+# value (which moves no running max, min or drawdown)
+def _blocks(x, window):
+    blocks = -(-len(x) // window)
+    return np.pad(x, (0, blocks * window - len(x)), mode='edge').reshape(blocks, window)
+
+
+# Maximum drawdown (worst peak-to-trough fall, as a negative fraction)
+# within every full window, with the van Herk/Gil-Werman block split: a
+# window not aligned to a block is the suffix of one block followed by a
+# prefix of the next, so its worst fall lies within the suffix, within the
+# prefix, or from the suffix's peak to the prefix's trough. Running
+# drawdowns of every block prefix and suffix give all three in O(n) for
+# any window.
+def rolling_max_drawdown(x, window):
+    x = as_float_array(x)
+    n = len(x)
+    if window > n:
+        return np.full(n, np.nan)
+    blocks = _blocks(x, window)
+    # prefixes: the fall from the running peak, worst so far, and the trough
+    prefix_drawdown = np.minimum.accumulate(blocks / np.maximum.accumulate(blocks, axis=1) - 1,
+                                            axis=1).ravel()
+    prefix_min = np.minimum.accumulate(blocks, axis=1).ravel()
+    # suffixes, scanned from the block end: the fall from each bar to the
+    # lowest later bar, worst so far, and the peak
+    reverse = blocks[:, ::-1]
+    suffix_drawdown = np.minimum.accumulate(np.minimum.accumulate(reverse, axis=1) / reverse - 1,
+                                            axis=1)[:, ::-1].ravel()
+    suffix_max = np.maximum.accumulate(reverse, axis=1)[:, ::-1].ravel()
+
+    starts = np.arange(n - window + 1)
+    ends = starts + window - 1
+    split = np.minimum(np.minimum(suffix_drawdown[starts], prefix_drawdown[ends]),
+                       prefix_min[ends] / suffix_max[starts] - 1)
+    # a window aligned to a block is that block's full prefix
+    drawdown = np.where(starts % window == 0, prefix_drawdown[ends], split)
+    return nan_padded(drawdown, window)
+
+
+# annualized mean / standard deviation of the returns in each window
+def rolling_sharpe(returns, window, periods_per_year=TRADING_DAYS):
+    centered = returns - np.mean(returns)
+    sums = window_sums(centered, window)
+    squares = window_sums(centered ** 2, window)
+    mean = sums / window
+    variance = np.maximum(squares - sums * mean, 0) / (window - 1)
+    std = np.sqrt(variance)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, (mean + np.mean(returns)) / std * np.sqrt(periods_per_year), np.nan)
+    return sharpe
+
+
+# annualized root mean square of the negative returns in each window
+def rolling_downside_deviation(returns, window, periods_per_year=TRADING_DAYS):
+    downside = np.minimum(returns, 0) ** 2
+    return np.sqrt(window_sums(downside, window) / window * periods_per_year)
+
+
+# historical VaR (the loss at the 1 - level quantile) and CVaR (the mean
+# loss at or beyond it) of each window, as positive fractions
+def rolling_var_cvar(returns, window, level=VAR_LEVEL):
+    windows = np.lib.stride_tricks.sliding_window_view(returns, window)
+    k = int(np.floor((1 - level) * window))
+    var = np.empty(len(windows))
+    cvar = np.empty(len(windows))
+    for start in range(0, len(windows), VAR_CHUNK_WINDOWS):
+        chunk = np.partition(windows[start:start + VAR_CHUNK_WINDOWS], k, axis=1)
+        var[start:start + len(chunk)] = -chunk[:, k]
+        cvar[start:start + len(chunk)] = -chunk[:, :k + 1].mean(axis=1)
+    return var, cvar
+
+
+# every rolling metric of a close series as a frame aligned with it
+def rolling_risk(close, window, periods_per_year=TRADING_DAYS, level=VAR_LEVEL):
+    close = as_float_array(close)
+    returns = daily_returns(close)[1:]
+    metrics = pd.DataFrame(index=np.arange(len(close)), dtype=np.float64)
+    metrics['Max_Drawdown'] = rolling_max_drawdown(close, window)
+    if len(returns) < window:
+        for column in ('Sharpe', 'Downside_Deviation', 'VaR', 'CVaR'):
+            metrics[column] = np.nan
+        return metrics
+
+    metrics['Sharpe'] = nan_padded(rolling_sharpe(returns, window, periods_per_year), window, 1)
+    metrics['Downside_Deviation'] = nan_padded(rolling_downside_deviation(returns, window, periods_per_year), window, 1)
+    var, cvar = rolling_var_cvar(returns, window, level)
+    metrics['VaR'] = nan_padded(var, window, 1)
+    metrics['CVaR'] = nan_padded(cvar, window, 1)
+    return metrics
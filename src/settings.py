@@ -0,0 +1,51 @@
+import os
+
+
+# dashboard tunables, overridable through BMW_* environment variables
+def env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# most points a single chart trace may send to the browser
+MAX_POINTS_PER_TRACE = env_int('BMW_MAX_POINTS_PER_TRACE', 1500)
+
+# derived results (figures, tables, backtests, ...) shared by every session:
+# memory budget, an optional directory for a disk tier, and its budget
+RESULT_CACHE_MB = env_int('BMW_RESULT_CACHE_MB', 256)
+RESULT_CACHE_DIR = os.environ.get('BMW_RESULT_CACHE_DIR', '')
+RESULT_CACHE_DISK_MB = env_int('BMW_RESULT_CACHE_DISK_MB', 1024)
+
+# precompute every date preset's charts and statistics in the background
+# once a symbol is loaded
+WARMUP = os.environ.get('BMW_WARMUP', '1').lower() in ('1', 'true', 'yes', 'on')
+
+# symbols whose frames stay loaded in memory at once
+SYMBOL_CACHE_SIZE = env_int('BMW_SYMBOL_CACHE_SIZE', 8)
+
+# time every dashboard section (also enabled per page with ?profile=1)
+PROFILE = os.environ.get('BMW_PROFILE', '').lower() in ('1', 'true', 'yes', 'on')
+
+# live feed: csv to follow as it is appended to (empty replays the bundled
+# data), bars kept on screen, seconds between updates and bars per replay tick
+LIVE_SOURCE = os.environ.get('BMW_LIVE_SOURCE', '')
+LIVE_BUFFER_SIZE = env_int('BMW_LIVE_BUFFER_SIZE', 500)
+LIVE_REFRESH_SECONDS = env_int('BMW_LIVE_REFRESH_SECONDS', 1)
+LIVE_BARS_PER_TICK = env_int('BMW_LIVE_BARS_PER_TICK', 5)
+
+# worker processes for parameter sweeps (1 runs them in the dashboard process)
+SWEEP_WORKERS = env_int('BMW_SWEEP_WORKERS', os.cpu_count() or 1)
+
+# Monte Carlo: paths simulated per forecast and paths generated at once
+MC_PATHS = env_int('BMW_MC_PATHS', 20000)
+MC_CHUNK_PATHS = env_int('BMW_MC_CHUNK_PATHS', 2000)
+
+# background rendering: 'full' animates the starfield at the display's frame
+# rate and re-sends the page styles every rerun; 'performance' caps the
+# starfield at STARFIELD_FPS, pauses it in hidden tabs, draws one star per
+# STARFIELD_PIXELS_PER_STAR of viewport and injects everything once per session
+RENDER_MODE = os.environ.get('BMW_RENDER_MODE', 'full').lower()
+STARFIELD_FPS = env_int('BMW_STARFIELD_FPS', 30)
+STARFIELD_PIXELS_PER_STAR = env_int('BMW_STARFIELD_PIXELS_PER_STAR', 10000)
@@ -0,0 +1,85 @@
+import numpy as np
+
+from arrays import as_float_array
+
+# Monte Carlo price paths from a window of returns, either geometric
+# Brownian motion fitted to their mean and standard deviation (the normal
+# curve drawn over the returns histogram) or a bootstrap that resamples the
+# returns themselves. Paths are generated in chunks so memory stays at
+# chunk_paths x horizon however many paths are drawn: each chunk is folded
+# into per-step histograms of cumulative log returns, from which the fan
+# chart quantiles are read, and only the terminal returns are kept for
+# VaR/CVaR.
+
+METHODS = ("GBM", "Bootstrap")
+FAN_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+VAR_LEVELS = (0.95, 0.99)
+
+# histogram bins per step, spanning +/- HISTOGRAM_SIGMAS standard deviations
+# of the cumulative log return; paths beyond that land in the end bins
+HISTOGRAM_BINS = 2000
+HISTOGRAM_SIGMAS = 8
+
+
+def _log_steps(rng, method, log_returns, n_paths, horizon):
+    if method == "GBM":
+        # log returns of GBM with the window's mean and volatility
+        mean, std = np.mean(np.expm1(log_returns)), np.std(np.expm1(log_returns), ddof=1)
+        return rng.normal(mean - std ** 2 / 2, std, (n_paths, horizon))
+    return rng.choice(log_returns, (n_paths, horizon))
+
+
+# quantiles of every step from its histogram counts, interpolating inside
+# the bin that crosses each rank
+def _histogram_quantiles(counts, lows, widths, quantiles):
+    cumulative = np.cumsum(counts, axis=1)
+    total = cumulative[:, -1:]
+    result = {}
+    for q in quantiles:
+        rank = q * total
+        bins = np.minimum((cumulative < rank).sum(axis=1), counts.shape[1] - 1)
+        steps = np.arange(len(counts))
+        before = np.where(bins > 0, cumulative[steps, np.maximum(bins - 1, 0)], 0)
+        inside = counts[steps, bins]
+        frac = np.divide(rank[:, 0] - before, inside, out=np.full(len(counts), 0.5), where=inside > 0)
+        result[q] = lows + (bins + frac) * widths
+    return result
+
+
+# Simulate n_paths price paths `horizon` bars ahead of the last close.
+# Returns the fan chart price quantiles per step (step 0 is the last
+# close), the simulated terminal returns, and VaR/CVaR of the terminal
+# return at each confidence level as positive loss fractions.
+def simulate_prices(close, horizon, n_paths, method="GBM", chunk_paths=2000, seed=0,
+                    quantiles=FAN_QUANTILES, var_levels=VAR_LEVELS):
+    close = as_float_array(close)
+    log_returns = np.diff(np.log(close))
+    log_returns = log_returns[np.isfinite(log_returns)]
+    rng = np.random.default_rng(seed)
+
+    # per-step histogram range around the expected cumulative log return
+    steps = np.arange(1, horizon + 1)
+    spread = HISTOGRAM_SIGMAS * max(np.std(log_returns), 1e-12) * np.sqrt(steps)
+    lows = steps * np.mean(log_returns) - spread
+    widths = 2 * spread / HISTOGRAM_BINS
+    offsets = np.arange(horizon) * HISTOGRAM_BINS
+
+    counts = np.zeros(horizon * HISTOGRAM_BINS, dtype=np.int64)
+    terminal = np.empty(n_paths)
+    for start in range(0, n_paths, chunk_paths):
+        n = min(chunk_paths, n_paths - start)
+        paths = np.cumsum(_log_steps(rng, method, log_returns, n, horizon), axis=1)
+        bins = np.clip(((paths - lows) / widths).astype(np.int64), 0, HISTOGRAM_BINS - 1)
+        counts += np.bincount((bins + offsets).ravel(), minlength=len(counts))
+        terminal[start:start + n] = np.expm1(paths[:, -1])
+
+    log_quantiles = _histogram_quantiles(counts.reshape(horizon, HISTOGRAM_BINS), lows, widths, quantiles)
+    last_close = close[-1]
+    fan = {q: np.concatenate(([last_close], last_close * np.exp(values))) for q, values in log_quantiles.items()}
+
+    risk = {}
+    for level in var_levels:
+        cutoff = np.quantile(terminal, 1 - level)
+        risk[level] = {'var': -cutoff, 'cvar': -terminal[terminal <= cutoff].mean()}
+
+    return {'fan': fan, 'terminal': terminal, 'risk': risk}
@@ -0,0 +1,113 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_loader import COLUMN_DTYPES, DATA_PATH, load_ohlcv
+
+
+# fixed-capacity column store: appends overwrite the oldest bars, so a live
+# feed can run indefinitely in constant memory
+class RingBuffer:
+    def __init__(self, capacity, dtypes=COLUMN_DTYPES):
+        self.capacity = capacity
+        self._columns = {col: np.empty(capacity, dtype=dtype) for col, dtype in dtypes.items()}
+        self._start = 0
+        self._size = 0
+        # bars ever appended, including those already overwritten
+        self.total = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, rows):
+        n = len(rows)
+        if n == 0:
+            return
+        self.total += n
+        if n > self.capacity:
+            rows = rows.iloc[-self.capacity:] if hasattr(rows, 'iloc') else {
+                col: np.asarray(values)[-self.capacity:] for col, values in rows.items()}
+            n = self.capacity
+
+        positions = (self._start + self._size + np.arange(n)) % self.capacity
+        for col, buffer in self._columns.items():
+            buffer[positions] = np.asarray(rows[col], dtype=buffer.dtype)
+        self._size += n
+        if self._size > self.capacity:
+            self._start = (self._start + self._size - self.capacity) % self.capacity
+            self._size = self.capacity
+
+    def last(self, col):
+        return self._columns[col][(self._start + self._size - 1) % self.capacity]
+
+    # buffered bars, oldest first
+    def to_frame(self):
+        order = (self._start + np.arange(self._size)) % self.capacity
+        return pd.DataFrame({col: buffer[order] for col, buffer in self._columns.items()})
+
+
+# replays an existing OHLCV file (or already loaded bars) a few bars per
+# read, as a stand-in for a live feed
+class ReplaySource:
+    def __init__(self, csv_path=DATA_PATH, bars_per_read=1, start=0, bars=None):
+        self._bars = load_ohlcv(csv_path) if bars is None else bars
+        self._position = start
+        self.bars_per_read = bars_per_read
+
+    @property
+    def exhausted(self):
+        return self._position >= len(self._bars)
+
+    def read(self):
+        rows = self._bars.iloc[self._position:self._position + self.bars_per_read]
+        self._position += len(rows)
+        return rows
+
+
+# follows a csv that another process appends bars to (like tail -f), reading
+# only complete lines written since the previous read
+class FileTailSource:
+    def __init__(self, path, from_start=False):
+        self.path = path
+        self._offset = 0 if from_start else os.path.getsize(path)
+
+    exhausted = False
+
+    def read(self):
+        size = os.path.getsize(self.path)
+        if size < self._offset:
+            # truncated or replaced: start over
+            self._offset = 0
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            if self._offset == 0:
+                # skip the header line
+                self._offset = len(f.readline())
+            chunk = f.read()
+
+        complete = chunk[:chunk.rfind(b'\n') + 1]
+        self._offset += len(complete)
+        if not complete.strip():
+            return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in COLUMN_DTYPES.items()})
+
+        rows = pd.read_csv(io.BytesIO(complete), names=list(COLUMN_DTYPES), parse_dates=['Date'])
+        return rows.astype(COLUMN_DTYPES)
+
+
+# a source feeding a ring buffer; poll() moves whatever the source has
+# produced since the last poll into the buffer
+class LiveFeed:
+    def __init__(self, source, capacity):
+        self.source = source
+        self.buffer = RingBuffer(capacity)
+
+    def poll(self):
+        rows = self.source.read()
+        if len(rows) and len(self.buffer):
+            # drop bars that do not move the feed forward
+            rows = rows[rows['Date'].to_numpy() > self.buffer.last('Date')]
+        self.buffer.append(rows)
+        return len(rows)
@@ -1,9 +1,13 @@
-import base64
+import hashlib
+import json
 import os
+from functools import lru_cache
 
-def get_page_styling():
-    return """
-        <style>
+# colors for up (close >= open) and down bars
+UP_COLOR = '#00ff88'
+DOWN_COLOR = '#ff4444'
+
+PAGE_CSS = """
     /* Main theme colors and styling */
     :root {
         --primary-color: #1E88E5;
@@ -160,9 +164,11 @@ def get_page_styling():
     ::-webkit-scrollbar-thumb:hover {
         background: var(--secondary-color);
     }
-    </style>
     """
 
+def get_page_styling():
+    return f"<style>{PAGE_CSS}</style>"
+
 def get_particles_js():
    return """
     <canvas id="starfield"></canvas>
@@ -237,16 +243,138 @@ def get_particles_js():
     </script>
     """
 
-# read gif file
-def read_gif(file_name):
-    with open(os.path.join(os.getcwd(),file_name),'rb') as f:
-        contents=f.read()
-        data_url=base64.b64encode(contents).decode('utf-8')
-    return data_url
+# Performance mode: a starfield that runs in the page itself at no more
+# than max_fps frames per second, stops while the tab is hidden and draws
+# one star per pixels_per_star of viewport (up to the full mode's 200)
+def get_starfield_script(max_fps, pixels_per_star):
+    return """
+    (() => {
+    const canvas = document.createElement('canvas');
+    canvas.style.cssText = 'position: fixed; top: 0; left: 0; width: 100vw; height: 100vh; '
+        + 'z-index: -1; background: #0d1117; pointer-events: none;';
+    document.body.prepend(canvas);
+    const ctx = canvas.getContext('2d');
+
+    const maxFps = %d;
+    const pixelsPerStar = %d;
+    const maxStars = 200;
+    let stars = [];
+    let centerX = 0;
+    let centerY = 0;
+
+    class Star {
+        constructor() {
+            this.reset();
+        }
+
+        reset() {
+            this.x = Math.random() * canvas.width - centerX;
+            this.y = Math.random() * canvas.height - centerY;
+            this.z = Math.random() * canvas.width;
+        }
+
+        update() {
+            this.z -= 10;
+            if (this.z <= 0) this.reset();
+        }
+
+        draw() {
+            const x = (this.x / this.z) * canvas.width + centerX;
+            const y = (this.y / this.z) * canvas.height + centerY;
+            const size = (1 - this.z / canvas.width) * 3;
+
+            ctx.beginPath();
+            ctx.arc(x, y, size, 0, Math.PI * 2);
+            ctx.fillStyle = '#1E88E5';
+            ctx.fill();
+        }
+    }
+
+    function resize() {
+        canvas.width = window.innerWidth;
+        canvas.height = window.innerHeight;
+        centerX = canvas.width / 2;
+        centerY = canvas.height / 2;
+        const count = Math.min(maxStars, Math.max(20, Math.round(canvas.width * canvas.height / pixelsPerStar)));
+        stars = Array.from({length: count}, () => new Star());
+    }
+
+    let frame = null;
+    let lastDrawn = 0;
+    function animate(now) {
+        frame = requestAnimationFrame(animate);
+        if (now - lastDrawn < 1000 / maxFps) return;
+        lastDrawn = now;
+
+        ctx.fillStyle = 'rgba(13, 17, 23, 0.2)';
+        ctx.fillRect(0, 0, canvas.width, canvas.height);
+        stars.forEach(star => {
+            star.update();
+            star.draw();
+        });
+    }
+
+    document.addEventListener('visibilitychange', () => {
+        if (document.hidden) {
+            cancelAnimationFrame(frame);
+            frame = null;
+        } else if (frame === null) {
+            frame = requestAnimationFrame(animate);
+        }
+    });
+    window.addEventListener('resize', resize);
+
+    resize();
+    frame = requestAnimationFrame(animate);
+    })();
+    """ % (max_fps, pixels_per_star)
+
+# Adds the page styles and a script to the Streamlit page from inside a
+# component frame. Both outlive the frame, so this only has to be rendered
+# once per session instead of on every rerun; the ids keep a second
+# injection from duplicating them.
+def get_session_injection(css, script):
+    # json strings are valid JS literals; escaping '</' keeps them from
+    # closing this <script> early
+    css, script = (json.dumps(text).replace('</', '<\\/') for text in (css, script))
+    return f"""
+    <script>
+    const doc = window.parent.document;
+    if (!doc.getElementById('bmw-styles')) {{
+        const style = doc.createElement('style');
+        style.id = 'bmw-styles';
+        style.textContent = {css};
+        doc.head.appendChild(style);
+    }}
+    if (!doc.getElementById('bmw-starfield')) {{
+        const script = doc.createElement('script');
+        script.id = 'bmw-starfield';
+        script.textContent = {script};
+        doc.body.appendChild(script);
+    }}
+    </script>
+    """
+
+# Images are served by Streamlit from the static/ folder next to app.py
+# (server.enableStaticServing in .streamlit/config.toml) instead of being
+# inlined as base64 on every rerun
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+STATIC_URL = 'app/static'
+
+ASSETS = {
+    "BMW": "giphy.webp"
+}
+
+
+def asset_path(name):
+    return os.path.join(STATIC_DIR, ASSETS[name])
 
-# create variables for gif files
-BMW_GIF = read_gif('assets/giphy.webp')
 
-URLS= {
-    "BMW": f"data:image/gif;base64,{BMW_GIF}"
-}
\ No newline at end of file
+# hashed once per process, on first use; with the content hash in the
+# query string the browser caches the file indefinitely and only fetches
+# it again when it changes
+@lru_cache(maxsize=None)
+def asset_url(name):
+    with open(asset_path(name), 'rb') as f:
+        version = hashlib.sha256(f.read()).hexdigest()[:12]
+    return f"{STATIC_URL}/{ASSETS[name]}?v={version}"
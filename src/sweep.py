@@ -0,0 +1,103 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+import pandas as pd
+
+from analytics import rsi
+from backtest import moving_average, rsi_signal, signal_sharpe
+from indicators import TRADING_DAYS
+
+# Sharpe ratio over grids of strategy parameters. The closing prices are
+# placed in one shared memory block that every worker maps instead of
+# receiving a pickled copy; the grid is split into chunks of rows, each
+# worker task fills one chunk, and the chunks are stacked in order.
+
+MA_GRID = tuple(range(5, 205, 5))
+RSI_PERIOD_GRID = tuple(range(5, 31))
+# oversold thresholds; overbought mirrors them (100 - oversold)
+RSI_THRESHOLD_GRID = tuple(range(10, 50, 5))
+
+# grid rows per worker task
+CHUNK_ROWS = 4
+
+
+def new_executor(workers):
+    if workers <= 1:
+        return None
+    # spawned workers only import this module, never the dashboard, and do
+    # not inherit the server's threads
+    return ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'))
+
+
+def _attach(name, length):
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(length, dtype=np.float64, buffer=shm.buf)
+
+
+# Sharpe of every fast (row) x slow (column) MA pair over bars lo..hi-1;
+# pairs whose fast average is not the shorter one are NaN
+def ma_chunk(name, length, lo, hi, fasts, slows, periods_per_year):
+    shm, close = _attach(name, length)
+    try:
+        averages = {period: moving_average(close, period) for period in set(fasts) | set(slows)}
+        returns = close[lo + 1:hi] / close[lo:hi - 1] - 1
+        sharpe = np.full((len(fasts), len(slows)), np.nan)
+        for i, fast in enumerate(fasts):
+            for j, slow in enumerate(slows):
+                if fast < slow:
+                    signal = averages[fast][lo:hi - 1] > averages[slow][lo:hi - 1]
+                    sharpe[i, j] = signal_sharpe(returns, signal, periods_per_year)
+        return sharpe
+    finally:
+        del close
+        shm.close()
+
+
+# Sharpe of every RSI period (row) x oversold threshold (column) pair
+def rsi_chunk(name, length, lo, hi, periods, thresholds, periods_per_year):
+    shm, close = _attach(name, length)
+    try:
+        returns = close[lo + 1:hi] / close[lo:hi - 1] - 1
+        sharpe = np.empty((len(periods), len(thresholds)))
+        for i, period in enumerate(periods):
+            rsi_values = rsi(close, period)
+            for j, oversold in enumerate(thresholds):
+                signal = rsi_signal(rsi_values, oversold, 100 - oversold)[lo:hi - 1]
+                sharpe[i, j] = signal_sharpe(returns, signal, periods_per_year)
+        return sharpe
+    finally:
+        del close
+        shm.close()
+
+
+SWEEPS = {
+    "MA Cross": (ma_chunk, MA_GRID, MA_GRID, "Fast MA", "Slow MA"),
+    "RSI": (rsi_chunk, RSI_PERIOD_GRID, RSI_THRESHOLD_GRID, "RSI Period", "Oversold"),
+}
+
+
+# Sharpe ratio grid (rows x columns DataFrame) of a strategy traded over
+# bars lo..hi-1 of `close`; signals see the full history. Runs on
+# `executor` when given, otherwise in this process.
+def run_sweep(close, kind, lo=0, hi=None, periods_per_year=TRADING_DAYS, executor=None):
+    task, rows, columns, row_name, column_name = SWEEPS[kind]
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    hi = len(close) if hi is None else hi
+
+    shm = shared_memory.SharedMemory(create=True, size=max(close.nbytes, 1))
+    try:
+        np.ndarray(len(close), dtype=np.float64, buffer=shm.buf)[:] = close
+        chunks = [rows[i:i + CHUNK_ROWS] for i in range(0, len(rows), CHUNK_ROWS)]
+        args = [(shm.name, len(close), lo, hi, chunk, columns, periods_per_year) for chunk in chunks]
+        if executor is None:
+            parts = [task(*a) for a in args]
+        else:
+            parts = list(executor.map(task, *zip(*args)))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return pd.DataFrame(np.vstack(parts),
+                        index=pd.Index(rows, name=row_name),
+                        columns=pd.Index(columns, name=column_name))
@@ -0,0 +1,36 @@
+import logging
+import threading
+
+logger = logging.getLogger('bmw_dashboard.warmup')
+
+
+# Runs precomputation tasks on a daemon thread so their results are cached
+# before anyone asks for them. Tasks are (function, args) pairs run in
+# order, most likely first. A request for a result the thread is computing
+# waits for it through the result cache instead of repeating the work, and
+# a failing task is only logged: the same call on the request path raises
+# it again where it can be shown.
+class Warmup:
+    def __init__(self, tasks, name='warmup'):
+        self.tasks = list(tasks)
+        self.done = 0
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def __len__(self):
+        return len(self.tasks)
+
+    @property
+    def ready(self):
+        return self.done == len(self.tasks)
+
+    def _run(self):
+        for fn, args in self.tasks:
+            try:
+                fn(*args)
+            except Exception:
+                logger.exception('warm-up of %s%r failed', fn.__name__, args)
+            self.done += 1
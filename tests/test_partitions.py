@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from partitions import RAW_LEVEL, PartitionedStore, build_partitions
+
+# 510 one-minute bars per session, 08:00 to 16:29
+BARS_PER_DAY = 510
+
+
+@pytest.fixture
+def store(tmp_path):
+    days = pd.bdate_range('2024-01-01', '2024-03-29')
+    dates = (days.values[:, None] + pd.to_timedelta(8 * 60 + np.arange(BARS_PER_DAY), 'min').values).ravel()
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 0.05, len(dates)))
+    df = pd.DataFrame({'Date': dates, 'Adj_Close': close, 'Close': close, 'High': close + 0.1,
+                       'Low': close - 0.1, 'Open': close, 'Volume': 1000})
+    csv_path = tmp_path / 'minutes.csv'
+    df.to_csv(csv_path, index=False)
+    build_partitions(csv_path, tmp_path / 'partitions', chunk_rows=7_000)
+    return PartitionedStore(str(tmp_path / 'partitions'))
+
+
+def test_short_range_is_raw_resolution(store):
+    day = pd.Timestamp('2024-02-14').date()
+    bars, level, lead = store.query(day, day, 1500)
+    assert level == RAW_LEVEL
+    assert lead == 0
+    assert len(bars) == BARS_PER_DAY
+    assert (bars['Date'].dt.date == day).all()
+
+
+def test_range_across_months_picks_finest_level_that_fits(store):
+    start, end = pd.Timestamp('2024-01-30').date(), pd.Timestamp('2024-02-02').date()
+    # four sessions of raw bars do not fit, 5-minute bars do
+    bars, level, _ = store.query(start, end, 1500)
+    assert level == '5min'
+    assert len(bars) == 4 * BARS_PER_DAY // 5
+
+
+def test_count_matches_query(store):
+    start, end = pd.Timestamp('2024-01-15').date(), pd.Timestamp('2024-03-05').date()
+    lo, hi = store.touched(start, end)
+    for level in store.levels:
+        bars, chosen, _ = store.query(start, end, store.count(level, start, end, lo, hi))
+        assert chosen == level
+        assert len(bars) == store.count(level, start, end, lo, hi)
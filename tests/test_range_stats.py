@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics import daily_returns, return_stats
+from range_stats import PrefixSums, RangeStats, SparseTable
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 400)))
+    return pd.DataFrame({
+        'High': close * 1.01,
+        'Low': close * 0.99,
+        'Close': close,
+        'Volume': rng.integers(1_000, 10_000, 400),
+        'Returns': daily_returns(close),
+    })
+
+
+def test_sparse_table_empty_range_is_nan():
+    table = SparseTable(np.arange(10.0), np.maximum)
+    assert np.isnan(table.query(4, 4))
+    assert np.isnan(table.query(5, 4))
+    assert table.query(4, 5) == 4
+    assert table.query(0, 10) == 9
+
+
+def test_prefix_sums_short_ranges():
+    sums = PrefixSums(np.array([1.0, 2.0, 4.0]))
+    assert np.isnan(sums.mean(1, 1))
+    for ddof in (0, 1):
+        assert np.isnan(sums.std(1, 1, ddof=ddof))
+        assert np.isnan(sums.std(1, 2, ddof=ddof))
+    assert sums.std(1, 3, ddof=0) == pytest.approx(1.0)
+    assert sums.std(1, 3, ddof=1) == pytest.approx(np.sqrt(2))
+
+
+def test_prefix_sums_constant_values_have_no_spread():
+    # a large offset leaves only rounding noise in the running sums
+    sums = PrefixSums(np.r_[np.linspace(0, 1e6, 1000), np.full(5, 123.456)])
+    assert np.isnan(sums.std(1000, 1005, ddof=0))
+
+
+def test_empty_range(frame):
+    stats = RangeStats(frame)
+    assert np.isnan(stats.price_change_pct(10, 10))
+    assert all(np.isnan(v) for v in stats.price_stats(10, 10).values())
+    assert all(np.isnan(v) for v in stats.return_stats(10, 10).values())
+    assert all(np.isnan(v) for v in stats.volume_stats(10, 10).values())
+
+
+def test_single_bar_range(frame):
+    stats = RangeStats(frame)
+    price = stats.price_stats(10, 11)
+    assert price['high'] == frame['High'][10]
+    assert price['current_vs_avg_pct'] == pytest.approx(0)
+    assert all(np.isnan(v) for v in stats.return_stats(10, 11).values())
+    assert np.isnan(stats.annualized_volatility(10, 11))
+
+
+def test_two_bar_range(frame):
+    stats = RangeStats(frame)
+    # one return inside the range, into its second bar
+    inside = frame['Returns'][11]
+    returns = stats.return_stats(10, 12)
+    assert returns['mean'] == pytest.approx(inside)
+    assert returns['positive_days_pct'] == (100 if inside > 0 else 0)
+    assert np.isnan(returns['std'])
+    assert np.isnan(returns['sharpe'])
+    volume = stats.volume_stats(10, 12)
+    assert volume['high'] == frame['Volume'][10:12].max()
+    assert volume['volatility_pct'] == pytest.approx(
+        np.std(frame['Volume'][10:12], ddof=1) / frame['Volume'][10:12].mean() * 100)
+
+
+def test_return_stats_match_analytics_on_the_slice(frame):
+    stats = RangeStats(frame)
+    expected = return_stats(daily_returns(frame['Close'][50:71]))
+    returns = stats.return_stats(50, 71)
+    for key, value in expected.items():
+        assert returns[key] == pytest.approx(value)
+    # the table's std and the volatility card come from the same returns
+    assert stats.annualized_volatility(50, 71) == pytest.approx(returns['std'] * np.sqrt(252) * 100)
@@ -0,0 +1,41 @@
+import os
+import pickle
+
+from result_cache import ResultCache
+
+
+class Moved:
+    pass
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    calls = []
+    compute = lambda: calls.append(1) or {'value': 42}
+    assert ResultCache(1 << 20, tmp_path, 1 << 20).get_or_compute('k', compute) == {'value': 42}
+    cache = ResultCache(1 << 20, tmp_path, 1 << 20)
+    assert cache.get_or_compute('k', compute) == {'value': 42}
+    assert len(calls) == 1
+    assert cache.disk_hits == 1
+
+
+def test_code_version_is_part_of_the_key(tmp_path):
+    calls = []
+    compute = lambda: calls.append(1) or len(calls)
+    assert ResultCache(1 << 20, tmp_path, 1 << 20, version='a').get_or_compute('k', compute) == 1
+    assert ResultCache(1 << 20, tmp_path, 1 << 20, version='b').get_or_compute('k', compute) == 2
+
+
+def test_unloadable_pickle_is_a_miss_and_is_removed(tmp_path):
+    cache = ResultCache(1 << 20, tmp_path, 1 << 20)
+    cache.get_or_compute('k', lambda: 1)
+    (path,) = tmp_path.glob('*.pkl')
+    # an entry pickled by a build whose class has since moved
+    payload = pickle.dumps(Moved()).replace(Moved.__module__.encode(), b'gone_module')
+    path.write_bytes(payload)
+
+    fresh = ResultCache(1 << 20, tmp_path, 1 << 20)
+    assert fresh.get_or_compute('k', lambda: 'recomputed') == 'recomputed'
+    assert fresh.misses == 1
+    # rewritten by the recomputation
+    assert pickle.loads(path.read_bytes()) == 'recomputed'
+    assert os.path.exists(path)
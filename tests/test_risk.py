@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from risk import rolling_max_drawdown, rolling_risk
+
+
+def brute_force_max_drawdown(x, window):
+    out = np.full(len(x), np.nan)
+    for end in range(window - 1, len(x)):
+        values = x[end - window + 1:end + 1]
+        out[end] = np.min(values / np.maximum.accumulate(values) - 1)
+    return out
+
+
+@pytest.mark.parametrize('n, window', [(500, 21), (500, 63), (252, 252), (100, 7), (64, 8), (10, 1)])
+def test_rolling_max_drawdown_matches_brute_force(n, window):
+    x = 100 * np.exp(np.cumsum(np.random.default_rng(n + window).normal(0, 0.02, n)))
+    np.testing.assert_allclose(rolling_max_drawdown(x, window), brute_force_max_drawdown(x, window),
+                               rtol=0, atol=1e-12)
+
+
+def test_rolling_max_drawdown_is_not_the_drawdown_from_the_peak():
+    # peak, crash, full recovery: the window's worst fall is still -50%
+    x = np.array([100, 50, 100, 100, 100], dtype=float)
+    assert rolling_max_drawdown(x, 3)[-1] == 0
+    assert rolling_max_drawdown(x, 3)[2] == -0.5
+
+
+def test_rolling_max_drawdown_window_longer_than_series():
+    assert np.isnan(rolling_max_drawdown(np.arange(1.0, 5.0), 10)).all()
+
+
+def test_rolling_risk_max_drawdown_column():
+    close = pd.Series(100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, 300))))
+    metrics = rolling_risk(close, 21)
+    np.testing.assert_allclose(metrics['Max_Drawdown'], brute_force_max_drawdown(close.to_numpy(), 21),
+                               rtol=0, atol=1e-12)